@@ -24,7 +24,20 @@ class RocketSizing:
     isp: float
     thrust: int
 
-def BasicSizing(mode):
+# Variable Definitions:
+# mode = "Hotfire" or "Waterflow", sets the default OF and Pc
+# Every other argument overrides the default input of the same name (None keeps the default), in SI units
+# percent_bell = 0.8       # Percent rao nozzle = 80%
+# eta_cstar = 0.85         # 80% combustion efficiency = eta_cstar
+# eta_cf = 0.95            # 95% nozzle efficiency = eta_cf
+# c = 1649.9               # Effective exhaust velocity = 1649.9 m/s        from CEA
+# c_star = 1154.1          # Characteristic exhaust velocity = 1154.1 m/s   from CEA
+# ER = 3.9821              # Expansion ratio Ae/At                          from CEA
+# gamma = None             # Exhaust gamma. When set, theta_n/theta_e come from the NozzleMOC family for this
+#                          # percent_bell instead of the 80% Rao table (ValueError outside the family)
+
+def BasicSizing(mode, thrust=None, d_c=None, L_star=None, percent_bell=0.8, eta_cstar=0.85, eta_cf=0.95,
+                c=1649.9, c_star=1154.1, ER=3.9821, OF=None, Pc=None, gamma=None):
     #INPUTS
     # Conversion Factors
     lbf_to_N = 4.44822162
@@ -34,22 +47,19 @@ def BasicSizing(mode):
 
     # Mode dependent vars
     if mode == "Hotfire": # Hotfire Input Values
-        OF = 3                    # Oxidizer-Fuel Ratio = 3
-        Pc = 300*psi_to_pa        # Chamber pressure [Pa], 300 psia
+        OF = 3 if OF is None else OF                          # Oxidizer-Fuel Ratio = 3
+        Pc = 300*psi_to_pa if Pc is None else Pc              # Chamber pressure [Pa], 300 psia
     if mode == "Waterflow": # Water Input values
-        OF = 1                    # Oxidizer-Fuel Ratio = 1
-        Pc = 14.7*psi_to_pa        # Chamber pressre [Pa], 14.7psia
+        OF = 1 if OF is None else OF                          # Oxidizer-Fuel Ratio = 1
+        Pc = 14.7*psi_to_pa if Pc is None else Pc             # Chamber pressre [Pa], 14.7psia
 
     # Define inputs
-    thrust = 400*lbf_to_N    # Thrust = 400lbf
-    d_c = 3.25*in_to_m       # Chamber dia. = 3.25" = 0.08255m
-    L_star = 60*in_to_m      # Characteristic length = 60" = 1.524m
-    percent_bell = 0.8       # Percent rao nozzle = 80%
-    eta_cstar = 0.85         # 80% combustion efficiency = eta_cstar
-    eta_cf = 0.95            # 95% nozzle efficiency = eta_cf
-    c = 1649.9               # Effective exhaust velocity = 1649.9 m/s        from CEA
-    c_star = 1154.1          # Characteristic exhaust velocity = 1154.1 m/s   from CEA
-    ER = 3.9821              # Expansion ratio Ae/At                          from CEA
+    if thrust is None:
+        thrust = 400*lbf_to_N    # Thrust = 400lbf
+    if d_c is None:
+        d_c = 3.25*in_to_m       # Chamber dia. = 3.25" = 0.08255m
+    if L_star is None:
+        L_star = 60*in_to_m      # Characteristic length = 60" = 1.524m
     print_results = False
 
     #GENERAL CALCULATIONS
@@ -94,6 +104,16 @@ def BasicSizing(mode):
         theta_n_deg = np.interp(ER, eratio, theta_n_80)
         theta_e_deg = np.interp(ER, eratio, theta_e_80)
 
+    # Method of characteristics family (truncated thrust-optimized contours)
+    if gamma is not None:
+        from NozzleMOC import moc_angles
+        theta_n_moc, theta_e_moc, _ = moc_angles(gamma, ER, percent_bell)
+        if not (np.isfinite(theta_n_moc) and np.isfinite(theta_e_moc)):
+            raise ValueError(f"ER {ER} at {percent_bell:.0%} bell is outside the MOC family for gamma {gamma} "
+                             f"(see NozzleMOC coverage), use gamma=None for the 80% Rao table")
+        theta_n_deg = float(theta_n_moc)
+        theta_e_deg = float(theta_e_moc)
+
     theta_n = (theta_n_deg)     # Theta N value [deg]
     theta_e = (theta_e_deg)     # Theta E value [deg]
 
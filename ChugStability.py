@@ -0,0 +1,186 @@
+# This code provides a low frequency (chug) combustion stability screen. BasicSizing fixes L* at 60 in and
+# InjectorSizing takes the injector pressure drop as 20% of Pc by rule of thumb; this checks whether that pair (and
+# the feed lines behind the injector) is stable, over whole grids of L*, dP fraction and feed line length at once.
+
+# Model (Summerfield single time lag, with feed line inertance):
+# Chamber gas:        theta_g d(phi)/dt + phi = sum_k w_k mu_k(t - tau)
+# Injector + feed k:  mu_k = -phi / Z_k,   Z_k(s) = (2 dP_inj + 2 dP_line_k + s I_k m_dot_k) / Pc
+# phi = p'/Pc, mu_k = m_dot_k'/m_dot_k, w_k = propellant k's share of the total flow. Injector and line drops are
+# both taken as ~m_dot^2, so their resistances are 2 dP / m_dot. The tank pressure is held constant.
+#   theta_g = gas residence time = rho_c V_c / m_dot = V_c Pc / (m_dot (Gamma c*)^2)       (R T_c = (Gamma c*)^2)
+#   tau     = combustion time lag (injection to gas)
+#   I_k     = feed line inertance = L / A                                                   [1/m]
+# Characteristic equation 1 + G(s) = 0 with G(s) = e^(-s tau) / (1 + s theta_g) * sum_k w_k / Z_k(s). G has no
+# right half plane poles, so by Nyquist the system is stable when |G| < 1 where the phase of G first reaches -180 deg.
+# That frequency is found by bisection for every design at once, and
+#   gain_margin = 1 / |G(i w_180)|      (> 1 is stable)
+#   chug_freq_hz = w_180 / 2 pi         (frequency the chamber would chug at)
+# Without feed lines and with tau >> theta_g this gives the classic dP_inj/Pc > 1/2 requirement; a longer L*
+# (larger theta_g) lets the injector run with less pressure drop.
+
+# Combustion time lag:
+# tau is not something this code can predict well. By default it is scaled from a reference lag at the Hotfire Pc,
+# tau = tau_ref (Pc_ref / Pc)^0.5 (droplet vaporization speeds up with pressure). Pass tau directly once a hotfire
+# chug frequency has been measured.
+
+# Useful links:
+# https://ntrs.nasa.gov/citations/19720026079 NASA SP-194 Liquid Propellant Rocket Combustion Instability, ch. 5
+# https://arc.aiaa.org/doi/10.2514/8.12645 Summerfield, A Theory of Unstable Combustion in Liquid Propellant Rocket Systems
+
+# Imports:
+import dataclasses
+import numpy as np
+from FeedPressureDrop import calculate_pressure_drop
+
+# Conversion Factors
+psi_to_pa = 6894.76
+in_to_m = 0.0254
+
+TAU_REF = 1.5e-3               # Combustion time lag at PC_REF [s], typical 1-3 ms for pintle N2O/E98
+PC_REF = 300 * psi_to_pa       # Hotfire chamber pressure [Pa]
+
+
+# Gas residence time [s], V_c [m^3], Pc [Pa], m_dot [kg/s], c_star [m/s] (as delivered, i.e. with eta_cstar)
+def residence_time(V_c, Pc, m_dot, c_star, gamma=1.22):
+    Gamma = np.sqrt(gamma) * (2 / (gamma + 1))**((gamma + 1) / (2 * (gamma - 1)))
+    return V_c * Pc / (m_dot * (Gamma * c_star)**2)
+
+
+# Combustion time lag [s] scaled from the reference lag
+def combustion_time_lag(Pc, tau_ref=TAU_REF, Pc_ref=PC_REF, exponent=0.5):
+    return tau_ref * (Pc_ref / np.asarray(Pc))**exponent
+
+
+# Feed line inertance L / A [1/m]
+def line_inertance(L, D):
+    return L / (np.pi * (D / 2)**2)
+
+
+# Gain margin and chug frequency for every design, all inputs broadcast together.
+# feeds = list of (w, dP_line, I, m_dot), one per propellant
+def gain_margin(theta_g, tau, Pc, dP_inj, feeds, iterations=40):
+    theta_g, tau, Pc, dP_inj = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (theta_g, tau, Pc, dP_inj)))
+
+    def loop_gain(w):
+        s = 1j * w
+        feed = sum(weight / ((2 * dP_inj + 2 * dP_line + s * I * m_dot) / Pc) for weight, dP_line, I, m_dot in feeds)
+        return np.exp(-s * tau) / (1 + s * theta_g) * feed
+
+    # Unwrapped phase: the delay term is added separately, the lag terms each stay within (-90, 0] deg
+    def phase(w):
+        G = loop_gain(w) * np.exp(1j * w * tau)
+        return np.angle(G) - w * tau
+
+    # Phase is 0 at w = 0 and below -180 deg at w = pi / tau
+    lo = np.zeros_like(tau)
+    hi = np.pi / tau
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        above = phase(mid) > -np.pi
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+
+    w_180 = (lo + hi) / 2
+    return 1 / np.abs(loop_gain(w_180)), w_180 / (2 * np.pi)
+
+
+# Variable Definitions:
+# sizing = RocketSizing from BasicSizing, or the dict of columns from SweepExecutor.sizing_kernel
+# L_star = characteristic length [m]; None keeps the sizing's chamber volume (V_c = L_c A_c)
+# dP_fraction = injector pressure drop / Pc, same for both propellants; None uses InjectorSizing.injector_drop
+#               (20% of Pc hotfire, 80% and at least 40 psi waterflow)
+# line_length = feed line length from tank to injector, both propellants [m]
+# line_D_ox, line_D_fuel = feed line inner diameters [m] (1/2" and 3/8" tube, 0.035" wall)
+# Cv_ox, Cv_fuel = total flow coefficient of the valves and fittings in each line
+# epsilon = tube roughness [m]
+# tau = combustion time lag [s]; None uses combustion_time_lag(Pc)
+# gamma = chamber gas gamma for the residence time
+# ox_temp, ox_mu, fuel_rho, fuel_mu = feed properties (N2O density comes from InjectorSizing.ox_density)
+#
+# Every argument after sizing can be an array; they broadcast together, so np.meshgrid'ed grids of L*, dP fraction
+# and line length are screened in one pass. Returns a dict of columns with the broadcast shape.
+
+def chug_screen(sizing, L_star=None, dP_fraction=None, line_length=1.0, mode="Hotfire", line_D_ox=0.43 * in_to_m,
+                line_D_fuel=0.305 * in_to_m, Cv_ox=5.0, Cv_fuel=3.0, epsilon=1.5e-6, tau=None, gamma=1.22,
+                ox_temp=253, ox_mu=1.1e-4, fuel_rho=None, fuel_mu=1.2e-3):
+    from InjectorSizing import ox_density, injector_drop
+
+    fields = sizing if isinstance(sizing, dict) else dataclasses.asdict(sizing)
+    Pc = np.asarray(fields["Pc"], dtype=float)
+    m_dot_ox = np.asarray(fields["m_dot_ox"], dtype=float)
+    m_dot_fuel = np.asarray(fields["m_dot_fuel"], dtype=float)
+    m_dot = m_dot_ox + m_dot_fuel
+    A_t = np.pi * (np.asarray(fields["d_t"]) / 2)**2
+    c_star = Pc * A_t / m_dot                                   # As delivered, includes eta_cstar
+
+    # Chamber volume from the sizing, or from the L* grid the same way BasicSizing builds it
+    if L_star is None:
+        V_c = np.asarray(fields["L_c"]) * np.pi * (np.asarray(fields["d_c"]) / 2)**2
+    else:
+        V_c = np.asarray(L_star) * A_t
+    theta_g = residence_time(V_c, Pc, m_dot, c_star, gamma)
+    tau = combustion_time_lag(Pc) if tau is None else np.asarray(tau)
+
+    # Feed lines
+    dP_inj = injector_drop(mode, Pc, None if dP_fraction is None else np.asarray(dP_fraction))
+    if mode == "Hotfire":
+        ox_rho = ox_density(mode, ox_temp, float(np.mean(Pc + dP_inj)))
+        fuel_rho = 789 if fuel_rho is None else fuel_rho       # E98 density [kg/m^3]
+    else:
+        ox_rho, ox_mu = 1000, 1.0e-3                            # Water in both lines
+        fuel_rho, fuel_mu = 1000, 1.0e-3
+    dP_line_ox = calculate_pressure_drop(m_dot_ox, ox_rho, ox_mu, line_length, line_D_ox, epsilon, Cv_ox)
+    dP_line_fuel = calculate_pressure_drop(m_dot_fuel, fuel_rho, fuel_mu, line_length, line_D_fuel, epsilon, Cv_fuel)
+    I_ox = line_inertance(np.asarray(line_length), line_D_ox)
+    I_fuel = line_inertance(np.asarray(line_length), line_D_fuel)
+
+    feeds = [(m_dot_ox / m_dot, dP_line_ox, I_ox, m_dot_ox), (m_dot_fuel / m_dot, dP_line_fuel, I_fuel, m_dot_fuel)]
+    margin, freq = gain_margin(theta_g, tau, Pc, dP_inj, feeds)
+
+    shape = margin.shape
+    return {
+        "theta_g": np.broadcast_to(theta_g, shape),
+        "tau": np.broadcast_to(tau, shape),
+        "dP_line_ox": np.broadcast_to(dP_line_ox, shape),
+        "dP_line_fuel": np.broadcast_to(dP_line_fuel, shape),
+        "gain_margin": margin,
+        "chug_freq_hz": freq,
+        "stable": margin > 1,
+    }
+
+
+if __name__ == "__main__":
+    import time
+    import matplotlib.pyplot as plt
+    from BasicSizing import BasicSizing
+
+    sizing = BasicSizing("Hotfire")
+
+    # Grid of L*, injector dP fraction and feed line length
+    L_star = np.linspace(20, 80, 61) * in_to_m
+    dP_fraction = np.linspace(0.05, 0.5, 46)
+    line_length = np.array([0.5, 1.0, 2.0, 4.0])
+    grid = np.meshgrid(L_star, dP_fraction, line_length, indexing="ij")
+
+    current = chug_screen(sizing)
+    print(f"Current design (L* 60 in, dP 20%, 1 m lines): gain margin {float(current['gain_margin']):.2f}, "
+          f"chug at {float(current['chug_freq_hz']):.0f} Hz, theta_g {float(current['theta_g']) * 1000:.2f} ms, "
+          f"tau {float(current['tau']) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    screen = chug_screen(sizing, L_star=grid[0], dP_fraction=grid[1], line_length=grid[2])
+    print(f"{screen['gain_margin'].size} designs screened in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Stability boundary (gain margin = 1) in the L* / dP plane for each line length
+    plt.figure(figsize=(7, 5))
+    for k, length in enumerate(line_length):
+        plt.contour(L_star / in_to_m, dP_fraction * 100, screen["gain_margin"][:, :, k].T, levels=[1.0], colors=f"C{k}")
+        plt.plot([], [], color=f"C{k}", label=f"{length:g} m lines")
+    plt.plot(60, 20, "k*", markersize=12, label="Current design")
+    plt.xlabel("L* [in]")
+    plt.ylabel("Injector dP [% Pc]")
+    plt.title("Chug stability boundary (stable above and to the right)")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.show()
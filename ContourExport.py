@@ -0,0 +1,233 @@
+# This code provides an export stage for the nozzle contours from NozzleContour so they can go straight to CAD,
+# meshing or the lathe instead of being copied by hand.
+
+# Formats:
+# CSV   - x, r columns (plus a contour id column for batches) [m]
+# XYZ   - tab separated X Y Z point curve in mm, z = 0. Imports as a "curve through XYZ points" in SolidWorks /
+#         Fusion 360 and can be revolved about the X axis there (this is the STEP route, no STEP kernel needed)
+# DXF   - ASCII R12 DXF, one POLYLINE per contour in mm, revolve about the X axis in CAD
+# STL   - binary STL of the contour revolved about the X axis (ready for meshing tools)
+# GCODE - lathe style G1 moves, Z along the axis and X as diameter, in mm
+#
+# Every format is a sink generator: it writes its header, then one contour per send((x, r)), then its footer when
+# sent None. The writers stream an iterable of contours through one sink and export_contours streams it through
+# the sinks of every format at once, so a generator of thousands of candidate contours is consumed a single time
+# and never collected into one list. Passing wall_offset writes the contour offset outwards along the wall normal
+# by that distance (outer wall / coolant channel floor) instead of the hot wall.
+
+# Useful links:
+# https://paulbourke.net/dataformats/dxf/min3d.html (minimal R12 DXF)
+# https://en.wikipedia.org/wiki/STL_(file_format)#Binary
+# https://linuxcnc.org/docs/html/gcode/g-code.html
+
+# Imports:
+import numpy as np
+
+m_to_mm = 1000
+
+
+# Offsets a wall profile along its outward normal by distance [m]
+def offset_contour(x, r, distance):
+    x = np.asarray(x, dtype=float)
+    r = np.asarray(r, dtype=float)
+    if distance == 0:
+        return x, r
+
+    dx = np.gradient(x)
+    dr = np.gradient(r)
+    length = np.hypot(dx, dr)
+
+    # Outward normal of a profile running in +x is (-dr, dx)
+    return x - distance * dr / length, r + distance * dx / length
+
+
+def _contours(contours, wall_offset):
+    for x, r in contours:
+        yield offset_contour(x, r, wall_offset)
+
+
+def _open(target, mode):
+    if hasattr(target, "write"):
+        return target, False
+    return open(target, mode), True
+
+
+# Sends every contour (offset once) to every sink, then closes the sinks so they write their footers
+def _stream(sinks, contours, wall_offset):
+    for sink in sinks:
+        next(sink)
+    for x, r in _contours(contours, wall_offset):
+        for sink in sinks:
+            sink.send((x, r))
+    for sink in sinks:
+        try:
+            sink.send(None)
+        except StopIteration:
+            pass
+
+
+def _write(sink, contours, target, mode, wall_offset, **kwargs):
+    f, owned = _open(target, mode)
+    try:
+        _stream([sink(f, **kwargs)], contours, wall_offset)
+    finally:
+        if owned:
+            f.close()
+
+
+# CSV
+
+def _csv_sink(f):
+    f.write("contour,x_m,r_m\n")
+    i = 0
+    while (contour := (yield)) is not None:
+        x, r = contour
+        np.savetxt(f, np.column_stack([np.full(len(x), i), x, r]), fmt=["%d", "%.9g", "%.9g"], delimiter=",")
+        i += 1
+
+
+def write_csv(contours, target, wall_offset=0.0):
+    _write(_csv_sink, contours, target, "w", wall_offset)
+
+
+# XYZ POINT CURVE
+
+def _xyz_sink(f):
+    i = 0
+    while (contour := (yield)) is not None:
+        x, r = contour
+        if i:
+            f.write("\n")       # blank line separates curves
+        np.savetxt(f, np.column_stack([x, r, np.zeros(len(x))]) * m_to_mm, fmt="%.6f", delimiter="\t")
+        i += 1
+
+
+def write_xyz(contours, target, wall_offset=0.0):
+    _write(_xyz_sink, contours, target, "w", wall_offset)
+
+
+# DXF
+
+def _dxf_sink(f, layer="CONTOUR"):
+    f.write("0\nSECTION\n2\nENTITIES\n")
+    while (contour := (yield)) is not None:
+        x, r = contour
+        f.write(f"0\nPOLYLINE\n8\n{layer}\n66\n1\n70\n0\n")
+        vertices = np.column_stack([x, r]) * m_to_mm
+        f.write("".join(f"0\nVERTEX\n8\n{layer}\n10\n{vx:.6f}\n20\n{vy:.6f}\n30\n0.0\n" for vx, vy in vertices))
+        f.write(f"0\nSEQEND\n8\n{layer}\n")
+    f.write("0\nENDSEC\n0\nEOF\n")
+
+
+def write_dxf(contours, target, wall_offset=0.0, layer="CONTOUR"):
+    _write(_dxf_sink, contours, target, "w", wall_offset, layer=layer)
+
+
+# STL
+
+# Triangles of one contour revolved about the x axis, shape (n_triangles, 4, 3) as (normal, v1, v2, v3)
+def revolve_triangles(x, r, segments=72):
+    phi = np.linspace(0, 2*np.pi, segments + 1)
+    cos_phi = np.cos(phi)
+    sin_phi = np.sin(phi)
+
+    # Surface points, shape (len(x), segments + 1, 3)
+    points = np.stack([np.broadcast_to(x[:, None], (len(x), segments + 1)),
+                       r[:, None] * cos_phi[None, :],
+                       r[:, None] * sin_phi[None, :]], axis=-1)
+
+    a = points[:-1, :-1].reshape(-1, 3)
+    b = points[1:, :-1].reshape(-1, 3)
+    c = points[1:, 1:].reshape(-1, 3)
+    d = points[:-1, 1:].reshape(-1, 3)
+
+    v1 = np.concatenate([a, a])
+    v2 = np.concatenate([b, c])
+    v3 = np.concatenate([c, d])
+    normal = np.cross(v2 - v1, v3 - v1)
+    norm = np.linalg.norm(normal, axis=1, keepdims=True)
+    normal = np.divide(normal, norm, out=np.zeros_like(normal), where=norm > 0)
+    return np.stack([normal, v1, v2, v3], axis=1)
+
+
+_stl_record = np.dtype([("data", "<f4", (12,)), ("attr", "<u2")])
+
+
+def _stl_sink(f, segments=72):
+    f.write(b"revolved nozzle contour".ljust(80, b" "))
+    count_pos = f.tell()
+    f.write(np.uint32(0).tobytes())     # triangle count is patched in once all contours are written
+
+    n_triangles = 0
+    while (contour := (yield)) is not None:
+        x, r = contour
+        tris = revolve_triangles(x * m_to_mm, r * m_to_mm, segments)
+        records = np.zeros(len(tris), dtype=_stl_record)
+        records["data"] = tris.reshape(len(tris), 12)
+        f.write(records.tobytes())
+        n_triangles += len(tris)
+
+    f.seek(count_pos)
+    f.write(np.uint32(n_triangles).tobytes())
+    f.seek(0, 2)
+
+
+def write_stl(contours, target, wall_offset=0.0, segments=72):
+    _write(_stl_sink, contours, target, "wb", wall_offset, segments=segments)
+
+
+# G-CODE
+
+def _gcode_sink(f, feed=100.0, diameter_mode=True):
+    f.write("G21 ; mm\nG90 ; absolute\n")
+    f.write("G7 ; diameter mode\n" if diameter_mode else "G8 ; radius mode\n")
+    i = 0
+    while (contour := (yield)) is not None:
+        x, r = contour
+        z_mm = x * m_to_mm
+        x_mm = r * m_to_mm * (2 if diameter_mode else 1)
+        f.write(f"(contour {i})\n")
+        f.write(f"G0 X{x_mm[0]:.4f} Z{z_mm[0]:.4f}\n")
+        f.write(f"G1 F{feed:.1f}\n")
+        f.write("".join(f"G1 X{gx:.4f} Z{gz:.4f}\n" for gx, gz in zip(x_mm[1:], z_mm[1:])))
+        i += 1
+    f.write("M30\n")
+
+
+def write_gcode(contours, target, wall_offset=0.0, feed=100.0, diameter_mode=True):
+    _write(_gcode_sink, contours, target, "w", wall_offset, feed=feed, diameter_mode=diameter_mode)
+
+
+# Sink and file mode per format
+SINKS = {
+    "csv": (_csv_sink, "w"),
+    "xyz": (_xyz_sink, "w"),
+    "dxf": (_dxf_sink, "w"),
+    "stl": (_stl_sink, "wb"),
+    "gcode": (_gcode_sink, "w"),
+}
+
+WRITERS = {
+    "csv": write_csv,
+    "xyz": write_xyz,
+    "dxf": write_dxf,
+    "stl": write_stl,
+    "gcode": write_gcode,
+}
+
+
+# Writes one stream of contours to several formats in a single pass, e.g. export_contours(gen, "batch",
+# ["dxf", "stl"]). contours may be a generator (or a callable returning one); every file is opened up front and
+# each contour goes to all of them before the next one is drawn.
+def export_contours(contours, base_path, formats=("csv",), wall_offset=0.0, **writer_kwargs):
+    paths = [f"{base_path}.{'nc' if fmt == 'gcode' else fmt}" for fmt in formats]
+    files = []
+    try:
+        for fmt, path in zip(formats, paths):
+            files.append(open(path, SINKS[fmt][1]))
+        sinks = [SINKS[fmt][0](f, **writer_kwargs.get(fmt, {})) for fmt, f in zip(formats, files)]
+        _stream(sinks, contours() if callable(contours) else contours, wall_offset)
+    finally:
+        for f in files:
+            f.close()
+    return paths
@@ -47,11 +47,8 @@ def calculate_pressure_drop(m_dot, rho, mu, L, D, epsilon, Cv_total):
     Re = (rho * vel * D) / mu
     
     # Find Friction Factor (f) - Haaland Equation
-    if Re < 2300:
-        f = 64 / Re  # Laminar
-    else:
-        # Turbulent approximation
-        f = (-1.8 * np.log10((epsilon/D / 3.7)**1.11 + 6.9/Re))**-2
+    # Laminar below Re 2300, turbulent approximation above. np.where so arrays of lines work too
+    f = np.where(Re < 2300, 64 / Re, (-1.8 * np.log10((epsilon/D / 3.7)**1.11 + 6.9/Re))**-2)
         
     # Calculate Major Loss (Pa)
     dP_line = f * (L / D) * (0.5 * rho * vel**2)
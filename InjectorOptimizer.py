@@ -0,0 +1,241 @@
+# This code provides a mixed drill, multi row oxidizer orifice optimizer for the pintle injector. injector_sweep
+# rounds every hole to the single drill nearest the ideal diameter, so with a coarse drill list the oxidizer area
+# (and delta_P_error_percent) can be far off. Here every layout of up to three drill sizes over one or two rows is
+# searched for the ones that hit the target area, and the results come back as injector_sweep style columns that
+# InjectorRanking can window and rank on LMR, TMR, delta P and blockage.
+
+# Search:
+# For N holes and sizes a_i < a_j < a_l (hole areas) the total area is linear in the counts, so the count split that
+# lands closest to the target area A is found in closed form instead of by enumeration:
+#   one size:    the two drills bracketing A/N
+#   two sizes:   n_l = (A - N a_i) / (a_l - a_i), floor and ceil
+#   three sizes: branch on the middle count n_j, then the two size solve on the remaining N - n_j holes
+# Branches are bounded before they are built: a size set is only kept when it brackets the ideal hole area
+# (a_i <= A/N <= a_l) and n_j only runs over the interval where the remaining holes can still reach A. Every other
+# count split of the same sizes is strictly further from A, so nothing closer is lost. Three size branches further
+# than area_tol from A are dropped before any layout is built. All branches are numpy arrays built at once, the whole
+# search over every hole count takes ~80 ms.
+
+# Rows:
+# Blockage factor is the injector_sweep one, BF = sum(n d) / (pi shaft_dia). Layouts with BF > bf_max get a second
+# row, each drill size split evenly between the rows (odd holes alternate starting from the largest drill), and
+# row_blockage_factor is the fuller row. Layouts that need more than max_rows rows are dropped. Annulus thickness,
+# TMR and LMR use the count-weighted mean hole diameter sum(n d) / N.
+
+# Imports:
+import numpy as np
+from InjectorSizing import orifice_columns
+
+MAX_SIZES = 3
+
+
+# Variable Definitions:
+# Same inputs as injector_sweep, plus
+# max_sizes = most drill sizes mixed in one layout (1 to 3)
+# max_rows = most hole rows on the pintle (1 or 2)
+# bf_max = highest blockage factor allowed in one row
+# max_size_ratio = largest / smallest drill diameter allowed in one layout (keeps the spray pattern uniform)
+# min_count = fewest holes of any drill size used in a layout
+# area_tol = three size layouts are only kept within this relative oxidizer area error (they are the only ones that
+#            are not already one per size set, and there are ~100x more of them than one and two size layouts)
+#
+# Returns one column per result for every layout (no TMR/LMR window applied). hole_dia_mm_1..3 and holes_1..3 hold
+# the drill sizes (smallest first, nan when unused) and their counts.
+
+def optimize_orifices(m_dot_ox, m_dot_fuel_pint, OF, ox_rho, fuel_rho, delta_P_ox, shaft_dia, drills,
+                      discharge_coef=0.65, hole_counts=range(10, 120, 2), max_sizes=3, max_rows=2, bf_max=1.0,
+                      max_size_ratio=1.5, min_count=2, area_tol=1e-3):
+    drills = np.unique(drills)                    # Repeated catalog sizes would give zero area steps
+    area_ox = m_dot_ox / (discharge_coef * np.sqrt(2 * ox_rho * delta_P_ox))     # Standard Orifice Equation
+
+    sizes, counts = _layouts(area_ox, drills, np.asarray(hole_counts), max_sizes, max_size_ratio, min_count,
+                             area_tol)
+    diameters = np.where(sizes >= 0, drills[np.maximum(sizes, 0)], 0.0)
+
+    # Blockage and rows
+    num_holes = counts.sum(axis=1)
+    BF = (counts * diameters).sum(axis=1) / (np.pi * shaft_dia)
+    num_rows = np.maximum(np.ceil(BF / bf_max), 1).astype(int)
+    row_BF = np.where(num_rows == 1, BF, _row_blockage(counts, diameters, shaft_dia))
+    keep = (num_rows <= max_rows) & (row_BF <= bf_max)
+    sizes, counts, diameters = sizes[keep], counts[keep], diameters[keep]
+    num_holes, num_rows, row_BF = num_holes[keep], num_rows[keep], row_BF[keep]
+
+    act_dia_ox = (counts * diameters).sum(axis=1) / num_holes
+    act_A_ox = (counts * np.pi * diameters**2 / 4).sum(axis=1)
+    columns = orifice_columns(num_holes, act_dia_ox, act_A_ox, m_dot_ox, m_dot_fuel_pint, OF, ox_rho, fuel_rho,
+                              delta_P_ox, shaft_dia, discharge_coef)
+    columns["num_rows"] = num_rows
+    columns["num_sizes"] = (counts > 0).sum(axis=1)
+    columns["row_blockage_factor"] = row_BF
+    for k in range(MAX_SIZES):
+        columns[f"hole_dia_mm_{k + 1}"] = np.where(counts[:, k] > 0, diameters[:, k] * 1000, np.nan)
+        columns[f"holes_{k + 1}"] = counts[:, k]
+    return columns
+
+
+# Drill indices (-1 when unused) and hole counts for every bounded layout, shape (layouts, MAX_SIZES)
+def _layouts(area_ox, drills, hole_counts, max_sizes, max_size_ratio, min_count, area_tol=np.inf):
+    hole_area = np.pi * drills**2 / 4
+    parts = []
+
+    # One size, the two drills either side of the ideal hole area
+    upper = np.clip(np.searchsorted(hole_area, area_ox / hole_counts), 0, len(drills) - 1)
+    for idx in (np.maximum(upper - 1, 0), upper):
+        parts.append(_pack(hole_counts, [idx], [hole_counts]))
+
+    # Size sets within the diameter ratio, smallest drill first
+    i, l = np.triu_indices(len(drills), 1)
+    pairs = drills[l] / drills[i] <= max_size_ratio
+    i, l = i[pairs], l[pairs]
+
+    if max_sizes >= 2:
+        N, i2, l2 = _bracketing(area_ox, hole_area, hole_counts, i, l)
+        for n_l in _two_size(area_ox, N, hole_area[i2], hole_area[l2], min_count):
+            ok = np.isfinite(n_l)
+            parts.append(_pack(N[ok], [i2[ok], l2[ok]], [N[ok] - n_l[ok], n_l[ok]]))
+
+    if max_sizes >= 3:
+        i3, j3, l3 = _triples(i, l)
+        N, i3, l3, j3 = _bracketing(area_ox, hole_area, hole_counts, i3, l3, j3)
+        a_i, a_j, a_l = hole_area[i3], hole_area[j3], hole_area[l3]
+
+        # Middle counts that leave the other N - n_j holes able to reach the target area. Both conditions cap n_j:
+        #   N a_i + n_j (a_j - a_i) <= A   (all the rest on the smallest drill stays below A)
+        #   N a_l - n_j (a_l - a_j) >= A   (all the rest on the largest drill still reaches A)
+        lo = np.full(len(N), float(min_count))
+        hi = np.minimum.reduce([np.floor((area_ox - N * a_i) / (a_j - a_i)),
+                                np.floor((N * a_l - area_ox) / (a_l - a_j)), N - 2 * min_count])
+        length = np.maximum(hi - lo + 1, 0).astype(int)
+        branch = np.repeat(np.arange(len(N)), length)
+        n_j = lo[branch] + np.arange(length.sum()) - np.repeat(np.cumsum(length) - length, length)
+
+        rest = N[branch] - n_j
+        for n_l in _two_size(area_ox - n_j * a_j[branch], rest, a_i[branch], a_l[branch], min_count):
+            area = (rest - n_l) * a_i[branch] + n_j * a_j[branch] + n_l * a_l[branch]
+            ok = np.isfinite(n_l) & (np.abs(area - area_ox) <= area_tol * area_ox)
+            b = branch[ok]
+            parts.append(_pack(N[b], [i3[b], j3[b], l3[b]], [rest[ok] - n_l[ok], n_j[ok], n_l[ok]]))
+
+    sizes = np.concatenate([part[0] for part in parts])
+    counts = np.concatenate([part[1] for part in parts])
+
+    # Drop repeats (floor and ceil often agree) through one integer key per layout, much faster than unique rows
+    key = np.zeros(len(sizes), dtype=np.int64)
+    for k in range(MAX_SIZES):
+        key = (key * (len(drills) + 1) + sizes[:, k] + 1) * (int(hole_counts.max()) + 1) + counts[:, k]
+    _, first = np.unique(key, return_index=True)
+    return sizes[first], counts[first]
+
+
+# Every size triple i < j < l from the (i, l) pairs that are already within the diameter ratio
+def _triples(i, l):
+    gap = l - i - 1
+    pair = np.repeat(np.arange(len(i)), gap)
+    j = i[pair] + 1 + np.arange(gap.sum()) - np.repeat(np.cumsum(gap) - gap, gap)
+    return i[pair], j, l[pair]
+
+
+# (hole count, size set) combinations whose smallest and largest drill bracket the ideal hole area
+def _bracketing(area_ox, hole_area, hole_counts, small, large, *others):
+    ideal = area_ox / hole_counts[:, None]
+    n, k = np.nonzero((hole_area[small] <= ideal) & (ideal <= hole_area[large]))
+    return (hole_counts[n], small[k], large[k], *(other[k] for other in others))
+
+
+# Floor and ceil of the count of the larger drill that puts N holes of areas a_small/a_large at area_ox, clamped so
+# both drills keep at least min_count holes (the closest allowed split). nan when N < 2 min_count
+def _two_size(area_ox, N, a_small, a_large, min_count):
+    exact = (area_ox - N * a_small) / (a_large - a_small)
+    for n_large in (np.floor(exact), np.ceil(exact)):
+        n_large = np.clip(n_large, min_count, N - min_count)
+        yield np.where(N >= 2 * min_count, n_large, np.nan)
+
+
+# Smallest area error [m^2] over every layout of N holes by plain enumeration (no bounds), for checking _layouts
+def _brute_force_error(area_ox, drills, N, max_sizes=3, max_size_ratio=1.5, min_count=2):
+    drills = np.unique(drills)
+    hole_area = np.pi * drills**2 / 4
+    best = np.min(np.abs(N * hole_area - area_ox))
+
+    i, l = np.triu_indices(len(drills), 1)
+    pairs = drills[l] / drills[i] <= max_size_ratio
+    i, l = i[pairs], l[pairs]
+    n = np.arange(min_count, N - min_count + 1)
+    if max_sizes >= 2 and len(n):
+        area = (N - n[None, :]) * hole_area[i, None] + n[None, :] * hole_area[l, None]
+        best = min(best, np.min(np.abs(area - area_ox)))
+
+    if max_sizes >= 3:
+        i, j, l = _triples(i, l)
+        n_j, n_l = np.meshgrid(n, n, indexing="ij")
+        ok = N - n_j - n_l >= min_count
+        n_j, n_l = n_j[ok], n_l[ok]
+        if len(n_j):
+            for start in range(0, len(i), 256):
+                k = slice(start, start + 256)
+                area = ((N - n_j - n_l)[None, :] * hole_area[i[k], None] + n_j[None, :] * hole_area[j[k], None]
+                        + n_l[None, :] * hole_area[l[k], None])
+                best = min(best, np.min(np.abs(area - area_ox)))
+    return best
+
+
+def _pack(hole_counts, sizes, counts):
+    n = len(hole_counts)
+    packed_sizes = np.full((n, MAX_SIZES), -1)
+    packed_counts = np.zeros((n, MAX_SIZES), dtype=int)
+    for k, (size, count) in enumerate(zip(sizes, counts)):
+        packed_sizes[:, k] = size
+        packed_counts[:, k] = count
+    return packed_sizes, packed_counts
+
+
+# Blockage factor of the fuller row when each drill size is split evenly over two rows
+def _row_blockage(counts, diameters, shaft_dia):
+    odd = counts % 2
+    odd_rank = np.cumsum(odd[:, ::-1], axis=1)[:, ::-1]            # Odd holes alternate rows, largest drill first
+    row_1 = counts // 2 + odd * (odd_rank % 2)
+    row_2 = counts - row_1
+    fuller = np.maximum((row_1 * diameters).sum(axis=1), (row_2 * diameters).sum(axis=1))
+    return fuller / (np.pi * shaft_dia)
+
+
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+    pd.set_option("display.width", 200)
+    pd.set_option("display.max_columns", 20)
+    from BasicSizing import BasicSizing
+    from InjectorSizing import injector_sweep, ox_density, load_drills, film_percent
+    from InjectorRanking import CandidateIndex, default_criteria
+
+    # Same Hotfire inputs as InjectorSizing
+    sizing = BasicSizing("Hotfire")
+    delta_P_ox = sizing.Pc * 0.2
+    inputs = dict(m_dot_ox=sizing.m_dot_ox, m_dot_fuel_pint=sizing.m_dot_fuel * (1 - film_percent), OF=sizing.OF,
+                  ox_rho=ox_density("Hotfire", 253, sizing.Pc + delta_P_ox), fuel_rho=789, delta_P_ox=delta_P_ox,
+                  shaft_dia=sizing.d_c / 5, drills=load_drills(), discharge_coef=0.65)
+
+    start = time.perf_counter()
+    layouts = optimize_orifices(**inputs)
+    print(f"{len(layouts['num_holes'])} layouts searched in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Cross-check the bounded search against plain enumeration for a few hole counts
+    area_ox = inputs["m_dot_ox"] / (0.65 * np.sqrt(2 * inputs["ox_rho"] * delta_P_ox))
+    for N in (20, 40, 60):
+        sizes, counts = _layouts(area_ox, np.unique(inputs["drills"]), np.array([N]), 3, 1.5, 2)
+        hole_area = np.where(sizes >= 0, np.pi * np.unique(inputs["drills"])[np.maximum(sizes, 0)]**2 / 4, 0.0)
+        searched = np.min(np.abs((counts * hole_area).sum(axis=1) - area_ox)) / area_ox
+        brute = _brute_force_error(area_ox, inputs["drills"], N) / area_ox
+        print(f"N = {N}: best area error {searched:.2e} (search), {brute:.2e} (brute force)")
+        assert np.isclose(searched, brute, rtol=1e-9, atol=1e-15), "bounded search missed the best layout"
+
+    # Rank on LMR and delta P error inside the InjectorSizing windows
+    windows = {"TMR": (0.9, 1.5), "LMR": (1.0, 3.0)}
+    weights = {"LMR": 1.0, "delta_P": 1.0}
+    criteria = default_criteria()
+    for name, candidates in (("Single drill", injector_sweep(**inputs)), ("Mixed drills", layouts)):
+        index = CandidateIndex(candidates)
+        best = index.take(index.rank(5, windows, criteria, weights))
+        print(f"\n{name}, top 5:")
+        print(pd.DataFrame(best).filter(regex="num_|holes_|hole_dia_mm_|LMR|TMR|row_blockage|delta_P_error").round(4))
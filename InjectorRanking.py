@@ -0,0 +1,120 @@
+# This code provides a ranking engine for injector candidate sets (the column dicts returned by injector_sweep).
+# Windows are answered from sorted indexes on the key columns and the best k candidates are picked with
+# np.argpartition, so re-querying millions of candidates with new windows or weights never reruns the sweep.
+
+# Scoring:
+# Every criterion is (column, target, scale). The candidate's penalty for that criterion is
+#   |value - target| / scale        when a target is given
+#   value / scale                   when target is None (smaller is better, e.g. blockage factor, row count)
+# The total score is the weighted sum of penalties, lowest score ranks first.
+
+# Windows:
+# A window is {column: (min, max)}. Each column gets one argsort the first time it is queried, after which a
+# window is two np.searchsorted calls. With several windows the narrowest one is looked up in its index and
+# the others are checked only on that subset.
+
+# Useful links:
+# https://numpy.org/doc/stable/reference/generated/numpy.argpartition.html
+# https://numpy.org/doc/stable/reference/generated/numpy.searchsorted.html
+
+# Imports:
+import numpy as np
+
+
+# Default criteria built from the target windows used in InjectorSizing
+def default_criteria(target_LMR_min=1.0, target_LMR_max=3.0, target_TMR_min=0.9, target_TMR_max=1.5):
+    return {
+        "LMR": ("LMR", (target_LMR_min + target_LMR_max) / 2, (target_LMR_max - target_LMR_min) / 2),
+        "TMR": ("TMR", (target_TMR_min + target_TMR_max) / 2, (target_TMR_max - target_TMR_min) / 2),
+        "delta_P": ("delta_P_error_percent", 0.0, 10.0),     # 10% error counts as one unit of penalty
+        "spray_angle": ("spray_angle_deg", 90.0, 30.0),
+        "blockage": ("blockage_factor", None, 1.0),
+        "rows": ("num_rows", None, 1.0),
+    }
+
+
+# Only rank on LMR unless told otherwise (matches the original sort, now against the LMR window midpoint)
+DEFAULT_WEIGHTS = {"LMR": 1.0}
+
+
+# Weighted penalty for every candidate. Criteria with zero/missing weight are skipped.
+def score(columns, criteria, weights):
+    total = None
+    for name, weight in weights.items():
+        if not weight:
+            continue
+        column, target, scale = criteria[name]
+        value = np.asarray(columns[column], dtype=float)
+        penalty = np.abs(value - target) / scale if target is not None else value / scale
+        total = weight * penalty if total is None else total + weight * penalty
+
+    if total is None:
+        return np.zeros(len(next(iter(columns.values()))))
+    return total
+
+
+# Indices of the k smallest scores, best first. O(n) selection plus an O(k log k) sort of the winners.
+def top_k(scores, k):
+    n = len(scores)
+    if k >= n:
+        return np.argsort(scores, kind="stable")
+    best = np.argpartition(scores, k)[:k]
+    return best[np.argsort(scores[best], kind="stable")]
+
+
+class CandidateIndex:
+    def __init__(self, columns, key_columns=("LMR", "TMR", "delta_P_error_percent", "spray_angle_deg", "blockage_factor")):
+        self.columns = {key: np.asarray(value) for key, value in columns.items()}
+        self.size = len(next(iter(self.columns.values())))
+        self._order = {}
+        self._sorted = {}
+        for column in key_columns:
+            if column in self.columns:
+                self.sorted_index(column)
+
+    # Row order that sorts a column, built once per column
+    def sorted_index(self, column):
+        if column not in self._order:
+            order = np.argsort(self.columns[column], kind="stable")
+            self._order[column] = order
+            self._sorted[column] = self.columns[column][order]
+        return self._order[column]
+
+    # Rows with min <= value <= max, as positions into the column's sorted index
+    def _window_range(self, column, lo, hi):
+        self.sorted_index(column)
+        values = self._sorted[column]
+        return np.searchsorted(values, lo, side="left"), np.searchsorted(values, hi, side="right")
+
+    # Row numbers (ascending) that satisfy every window in {column: (min, max)}
+    def query(self, windows=None):
+        if not windows:
+            return np.arange(self.size)
+
+        ranges = {column: self._window_range(column, lo, hi) for column, (lo, hi) in windows.items()}
+        narrowest = min(ranges, key=lambda column: ranges[column][1] - ranges[column][0])
+        start, stop = ranges[narrowest]
+        rows = self._order[narrowest][start:stop]
+
+        keep = np.ones(len(rows), dtype=bool)
+        for column, (lo, hi) in windows.items():
+            if column == narrowest:
+                continue
+            values = self.columns[column][rows]
+            keep &= (lo <= values) & (values <= hi)
+
+        return np.sort(rows[keep])
+
+    # Best k rows (best first) inside the windows for the given criteria/weights
+    def rank(self, k=10, windows=None, criteria=None, weights=None):
+        criteria = default_criteria() if criteria is None else criteria
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+
+        rows = self.query(windows)
+        subset = {column: self.columns[column][rows] for column, _, _ in (criteria[name] for name in weights)}
+        scores = score(subset, criteria, weights) if subset else np.zeros(len(rows))
+        return rows[top_k(scores, k)]
+
+    # Column dict for a set of rows
+    def take(self, rows):
+        return {key: value[rows] for key, value in self.columns.items()}
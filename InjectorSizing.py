@@ -1,194 +1,248 @@
 import numpy as np
+from functools import lru_cache
 import pandas as pd
 import CoolProp.CoolProp as CP
 import matplotlib.pyplot as plt
 from BasicSizing import BasicSizing
+from PlotCache import load_or_compute, plot_sweep
+from InjectorRanking import CandidateIndex, default_criteria
 
 #https://purdue-space-program.atlassian.net/wiki/spaces/PL/pages/180486437/Injector+Design+and+Analysis
 #https://purdue-space-program.atlassian.net/wiki/spaces/PL/pages/1248264194/Phoenix+Injector
 #https://events.iist.ac.in/phd/thesis/SC09D002%20FT.pdf Film cooling study (in addition to basics from NASA SP-125)
 
-# RUN BASIC SIZING
-mode = "Hotfire"
-sizing = BasicSizing(mode)
-
-# INPUTS
-
-# Sizing call inputs
-m_dot_total = sizing.m_dot_total  # Total mass flow [kg/s]
-m_dot_fuel = sizing.m_dot_fuel    # Fuel mass flow [kg/s]
-m_dot_ox = sizing.m_dot_ox        # oxidizer mass flow [kg/s]
-OF = sizing.OF
-Pc = sizing.Pc
-d_c = sizing.d_c                  # Chamber diameter [m], 3.25"
-
-# Mode selection
-if mode == "Hotfire": # Hotfire Input Values
-    ox_temp = 253            # NOs temp [K], 0deg C
-if mode == "Waterflow": # Water Input values
-    ox_temp = 293             # Water temp [K] (water replacement for NOs)
-    fuel_temp = 293           # Water temp [K] (water replacement for E98)
-
-# User Inputs
-discharge_coef = 0.65
-skip_distance = 1        # Ratio of skip length (distance from annular to radial flow) to pintle diameter.
-shaft_ratio = 1/5        # Ratio used with BZ1 and BZB
-
-target_LMR_min = 1.0     # Minimum LMR (Flow characteristics of a pintle injector element https://www.sciencedirect.com/science/article/pii/S0094576518309883#fd2)
-target_LMR_max = 3.0     # Maximum LMR (Range between 1.5 and 3.0 recommended for best atomization and Wide, uniform spray pattern)
-
-target_TMR_min = 0.9     # keep around this range to have efficient shear mixing and optimize C*
-target_TMR_max = 1.5
-
 # Conversion Factors and Constants
 lbm_to_kg = 0.453592
 psi_to_pa = 6894.76
 in_to_m = 0.0254
 
-# Mass Flow Calcs
 film_percent = 0.05                   # 5% film cooling (from phoenix)
-m_dot_fuel_pint = m_dot_fuel * (1-film_percent)
-
-# Pintle Geo. Calcs
-shaft_dia = d_c * shaft_ratio
-shaft_rad = shaft_dia /2
-skip_len = skip_distance * shaft_dia
-print(f"Skip length: {skip_len}m")
-
-# Stiffness/Pressure Drops
-if mode =="Hotfire":
-    delta_P_ox = Pc * 0.2         # 20% Is standard value in industry
-elif mode == "Waterflow":
-    min_drop = 40 * psi_to_pa # 40psi min
-    delta_P_ox = max(Pc * 0.8, min_drop)
 
-inlet_P_ox = Pc + delta_P_ox    # Required injector inlet pressure [Pa]
 
-# Fluid Properties
-if mode == "Hotfire":
-    ox_rho = CP.PropsSI ("D", "T", ox_temp, "P", inlet_P_ox, "NitrousOxide")    # N2O density [kg/m^3]
-    fuel_rho = 789    # E98 density [kg/m^3]
-elif mode == "Waterflow":
-    ox_rho = 1000     # Water density [kg/m^3]
-    fuel_rho = 1000   # Water density [kg/m^3]
-print(ox_rho)
-print(fuel_rho)
+# Available Drill Bit Sizes [m], sorted. Cached so long running callers only read the spreadsheet once
+@lru_cache(maxsize=None)
+def load_drills(path=r"Drill_Bits.xlsx"):
+    drills_list = pd.read_excel(path)
+    return np.sort(pd.to_numeric(drills_list["Decimal Value (mm)"], errors="coerce").dropna().to_numpy() * 0.001) # Convert mm to m
+
 
-# Available Drill Bit Sizes
-drills_list = pd.read_excel(r"Drill_Bits.xlsx")
-drills = np.sort(pd.to_numeric(drills_list["Decimal Value (mm)"], errors="coerce").dropna() * 0.001) # Convert mm to m
-results = []
+# Oxidizer density at the injector inlet [kg/m^3]
+@lru_cache(maxsize=4096)
+def ox_density(mode, ox_temp, inlet_P_ox):
+    if mode == "Hotfire":
+        return CP.PropsSI ("D", "T", ox_temp, "P", inlet_P_ox, "NitrousOxide")    # N2O density [kg/m^3]
+    return 1000     # Water density [kg/m^3]
 
-#Optimization Loop (from flowchart on PSP confluence)
-for num_holes in range(10, 120, 2): # Needs to have atleast 10 holes. Increment by 2 for efficiency
+
+# Oxidizer injector pressure drop [Pa]. dP_fraction overrides the fraction of Pc (the waterflow floor still applies)
+def injector_drop(mode, Pc, dP_fraction=None):
+    if mode == "Hotfire":
+        return Pc * (0.2 if dP_fraction is None else dP_fraction)        # 20% Is standard value in industry
+    min_drop = 40 * psi_to_pa # 40psi min
+    return np.maximum(Pc * (0.8 if dP_fraction is None else dP_fraction), min_drop)
+
+
+# Variable Definitions:
+# m_dot_ox = oxidizer mass flow [kg/s]
+# m_dot_fuel_pint = fuel mass flow through the pintle annulus (film cooling removed) [kg/s]
+# OF = oxidizer-fuel ratio
+# ox_rho, fuel_rho = propellant densities [kg/m^3]
+# delta_P_ox = target oxidizer injector pressure drop [Pa]
+# shaft_dia = pintle shaft diameter [m]
+# drills = sorted drill bit diameters [m]
+# hole_counts = oxidizer hole counts to evaluate
+#
+# Returns one column per result for every hole count (no TMR/LMR window applied)
+
+def injector_sweep(m_dot_ox, m_dot_fuel_pint, OF, ox_rho, fuel_rho, delta_P_ox, shaft_dia, drills,
+                   discharge_coef=0.65, hole_counts=range(10, 120, 2)):
+    num_holes = np.asarray(hole_counts)
+    drills = np.asarray(drills)
 
     # Calculate theoretical hole diameter
     area_ox = m_dot_ox / (discharge_coef * np.sqrt(2 * ox_rho * delta_P_ox))     # Standard Orifice Equation
     hole_diameter = 2 * np.sqrt(area_ox / (np.pi * num_holes))                # Area of a circle times the number of holes needs to be total ox area
 
     # Find nearest drill size
-    idx = np.argmin(np.abs(hole_diameter - drills))
+    idx = np.argmin(np.abs(hole_diameter[:, None] - drills[None, :]), axis=1)
     act_dia_ox = drills[idx]
     act_A_ox = num_holes * np.pi * (act_dia_ox / 2)**2
-    
-    
+
+    return orifice_columns(num_holes, act_dia_ox, act_A_ox, m_dot_ox, m_dot_fuel_pint, OF, ox_rho, fuel_rho,
+                           delta_P_ox, shaft_dia, discharge_coef)
+
+
+# Annulus, momentum ratios, blockage and pressure drop for a set of oxidizer hole layouts.
+# act_dia_ox is the hole diameter (the count-weighted mean diameter for mixed drill layouts), act_A_ox the
+# total oxidizer area [m^2]
+def orifice_columns(num_holes, act_dia_ox, act_A_ox, m_dot_ox, m_dot_fuel_pint, OF, ox_rho, fuel_rho, delta_P_ox,
+                    shaft_dia, discharge_coef=0.65):
+    shaft_rad = shaft_dia / 2
+
     # Calc velocities
     vel_ox = m_dot_ox / (act_A_ox*ox_rho)                                    # Find exit velocity of oxdizer
-    
+
     # Calc Annulus
     #A_fuel = m_dot_fuel_pint / (discharge_coef * np.sqrt(2*fuel_rho*delta_P))
     #annular_thk = np.sqrt(shaft_rad**2 + A_fuel / np.pi) - shaft_rad
 
     annular_thk = (np.pi*ox_rho*act_dia_ox) / (4*fuel_rho*(OF**2))           # Eqt 1.9 from PSP Injector Design and Analysis page (which I think got it from NASA SP-8089)
-    A_fuel = np.pi * ((shaft_rad + annular_thk)**2 - shaft_rad**2)       
-    vel_fuel = m_dot_fuel_pint / (A_fuel * fuel_rho)                         
-    
+    A_fuel = np.pi * ((shaft_rad + annular_thk)**2 - shaft_rad**2)
+    vel_fuel = m_dot_fuel_pint / (A_fuel * fuel_rho)
+
     # Momentum Ratios
     TMR = (m_dot_ox * vel_ox) / (m_dot_fuel_pint * vel_fuel)                 # Eqt. 1.7 from PSP page
     BF = (num_holes * act_dia_ox) / (np.pi * shaft_dia)         # Eqt. 1.11 from PSP page
     LMR = TMR / BF                                              # Eqt. 1.13 from PSP page
-    
+
     # Check how many rows are needed
-    num_rows = 1
-    if (BF>1):
-        num_rows = 2
+    num_rows = np.where(BF > 1, 2, 1)
 
     act_delta_P = (m_dot_ox / (discharge_coef * act_A_ox))**2 / (2 * ox_rho)
     act_delta_P_psi = act_delta_P / psi_to_pa
 
-    # Only store configurations within target LMR range
-    if (target_TMR_min <= TMR <= target_TMR_max) and (target_LMR_min <= LMR <= target_LMR_max):
-        spray_angle = np.degrees(2 * 0.7 * np.arctan(2 * LMR))               # Eqt. 1.14 from PSP page (from Flow characteristics of a pintle injector element Eq(3))
-        
-        results.append({
-            "num_holes": num_holes,
-            "num_rows": num_rows,
-            "hole_diam_in": act_dia_ox / in_to_m,    # Convert back to inches
-            "hole_dia_mm": act_dia_ox * 1000,        # Diameter in mm (convert m to mm)
-            "annular_thk": annular_thk / in_to_m,
-            "LMR": LMR,
-            "TMR": TMR,
-            "blockage_factor": BF,
-            "spray_angle_deg": spray_angle,
-            "vel_ox": vel_ox,
-            "vel_fuel": vel_fuel,
-            "area_ox_in": act_A_ox/ in_to_m**2,      # Convert area to inches^2
-            "area_fuel_in": A_fuel/ in_to_m**2,      # Convert area to inches^2
-            "actual_delta_P_psi": act_delta_P_psi,
-            "delta_P_error_percent": ((act_delta_P / delta_P_ox) - 1) * 100,  #Will show if you're limited by drill bit size
-        })
-
-# Output Results
-if results:
-    target_TMR_mid = (target_TMR_min + target_TMR_max) / 2
-    results.sort(key=lambda x: abs(x["LMR"] - target_TMR_mid))
-    
-    # Create DataFrame and save to Excel
-    results_df = pd.DataFrame(results)
-    #results_df.to_excel("optimized_injector_configs.xlsx", index=False)
-    print(f"Found {len(results)} valid configurations. Top 3:")
-    top3 = results_df.head(7).round(5).reset_index(drop=True)
-    top3.index += 1
-    print(top3)
-else:
-    print("No valid configurations found. Try relaxing constraints.")
-
-# Plot Relationship between Number of Holes and LMR
-plot = 1 # Set to 1 to enable plotting
-if results and len(results) > 1 and plot:
-    # Create figure with two subplots
-    plt.figure(figsize=(12, 5))
-    
-    # TMR vs Hole Count
-    plt.subplot(1, 2, 1)
-    plt.plot(results_df["num_holes"], results_df["TMR"], "bo-")
-    plt.xlabel("Number of Holes")
-    plt.ylabel("TMR")
-    plt.title("TMR vs Hole Count")
-    plt.grid(True)
-    
-    # LMR vs Hole Count
-    plt.subplot(1, 2, 2)
-    plt.plot(results_df["num_holes"], results_df["LMR"], "ro-")
-    plt.xlabel("Number of Holes")
-    plt.ylabel("LMR")
-    plt.title("LMR vs Hole Count")
-    plt.grid(True)
-    
-    # Add horizontal lines showing target LMR range
-    plt.axhline(y=target_LMR_min, color="gray", linestyle="--")
-    plt.axhline(y=target_LMR_max, color="gray", linestyle="--")
-    
-    plt.tight_layout()
-    
-    # Save and show plot
-    #plt.savefig("hole_count_vs_momentum_ratios.png", dpi=300)
-    plt.show()
-else:
-    if plot == 1:
-        print("Not enough data points to generate meaningful plots")
-
-
-
-
-
+    spray_angle = np.degrees(2 * 0.7 * np.arctan(2 * LMR))               # Eqt. 1.14 from PSP page (from Flow characteristics of a pintle injector element Eq(3))
+
+    return {
+        "num_holes": num_holes,
+        "num_rows": num_rows,
+        "hole_diam_in": act_dia_ox / in_to_m,    # Convert back to inches
+        "hole_dia_mm": act_dia_ox * 1000,        # Diameter in mm (convert m to mm)
+        "annular_thk": annular_thk / in_to_m,
+        "LMR": LMR,
+        "TMR": TMR,
+        "blockage_factor": BF,
+        "spray_angle_deg": spray_angle,
+        "vel_ox": vel_ox,
+        "vel_fuel": vel_fuel,
+        "area_ox_in": act_A_ox/ in_to_m**2,      # Convert area to inches^2
+        "area_fuel_in": A_fuel/ in_to_m**2,      # Convert area to inches^2
+        "actual_delta_P_psi": act_delta_P_psi,
+        "delta_P_error_percent": ((act_delta_P / delta_P_ox) - 1) * 100,  #Will show if you're limited by drill bit size
+    }
+
+
+# Cached version of the full candidate set, the CoolProp call happens inside so re-plots skip it too
+def _candidate_columns(mode, ox_temp, inlet_P_ox, **sweep_inputs):
+    ox_rho = ox_density(mode, ox_temp, inlet_P_ox)
+    return injector_sweep(ox_rho=ox_rho, **sweep_inputs)
+
+
+if __name__ == "__main__":
+    # RUN BASIC SIZING
+    mode = "Hotfire"
+    sizing = BasicSizing(mode)
+
+    # INPUTS
+
+    # Sizing call inputs
+    m_dot_total = sizing.m_dot_total  # Total mass flow [kg/s]
+    m_dot_fuel = sizing.m_dot_fuel    # Fuel mass flow [kg/s]
+    m_dot_ox = sizing.m_dot_ox        # oxidizer mass flow [kg/s]
+    OF = sizing.OF
+    Pc = sizing.Pc
+    d_c = sizing.d_c                  # Chamber diameter [m], 3.25"
+
+    # Mode selection
+    if mode == "Hotfire": # Hotfire Input Values
+        ox_temp = 253            # NOs temp [K], 0deg C
+    if mode == "Waterflow": # Water Input values
+        ox_temp = 293             # Water temp [K] (water replacement for NOs)
+        fuel_temp = 293           # Water temp [K] (water replacement for E98)
+
+    # User Inputs
+    discharge_coef = 0.65
+    skip_distance = 1        # Ratio of skip length (distance from annular to radial flow) to pintle diameter.
+    shaft_ratio = 1/5        # Ratio used with BZ1 and BZB
+
+    target_LMR_min = 1.0     # Minimum LMR (Flow characteristics of a pintle injector element https://www.sciencedirect.com/science/article/pii/S0094576518309883#fd2)
+    target_LMR_max = 3.0     # Maximum LMR (Range between 1.5 and 3.0 recommended for best atomization and Wide, uniform spray pattern)
+
+    target_TMR_min = 0.9     # keep around this range to have efficient shear mixing and optimize C*
+    target_TMR_max = 1.5
+
+    # Mass Flow Calcs
+    m_dot_fuel_pint = m_dot_fuel * (1-film_percent)
+
+    # Pintle Geo. Calcs
+    shaft_dia = d_c * shaft_ratio
+    shaft_rad = shaft_dia /2
+    skip_len = skip_distance * shaft_dia
+    print(f"Skip length: {skip_len}m")
+
+    # Stiffness/Pressure Drops
+    delta_P_ox = float(injector_drop(mode, Pc))    # 20% of Pc hotfire, 80% (at least 40 psi) waterflow
+
+    inlet_P_ox = Pc + delta_P_ox    # Required injector inlet pressure [Pa]
+
+    # Fluid Properties
+    if mode == "Hotfire":
+        fuel_rho = 789    # E98 density [kg/m^3]
+    elif mode == "Waterflow":
+        fuel_rho = 1000   # Water density [kg/m^3]
+
+    drills = load_drills()
+
+    #Optimization Sweep (from flowchart on PSP confluence)
+    # Needs to have atleast 10 holes. Increment by 2 for efficiency
+    sweep_inputs = dict(mode=mode, ox_temp=ox_temp, inlet_P_ox=inlet_P_ox, m_dot_ox=m_dot_ox,
+                        m_dot_fuel_pint=m_dot_fuel_pint, OF=OF, fuel_rho=fuel_rho, delta_P_ox=delta_P_ox,
+                        shaft_dia=shaft_dia, drills=drills, discharge_coef=discharge_coef,
+                        hole_counts=list(range(10, 120, 2)))
+    candidates = load_or_compute("injector_sweep", sweep_inputs, _candidate_columns)
+
+    # Only keep configurations within target LMR range, ranked by weighted distance to the targets
+    # (see InjectorRanking.default_criteria for the available criteria)
+    ranking_weights = {"LMR": 1.0}
+    index = CandidateIndex(candidates)
+    windows = {"TMR": (target_TMR_min, target_TMR_max), "LMR": (target_LMR_min, target_LMR_max)}
+    criteria = default_criteria(target_LMR_min, target_LMR_max, target_TMR_min, target_TMR_max)
+    valid_rows = index.query(windows)
+    results = index.take(index.rank(len(valid_rows), windows, criteria, ranking_weights))
+
+    # Output Results
+    if len(results["num_holes"]):
+        # Create DataFrame and save to Excel
+        results_df = pd.DataFrame(results)
+        #results_df.to_excel("optimized_injector_configs.xlsx", index=False)
+        print(f"Found {len(results_df)} valid configurations. Top 3:")
+        top3 = results_df.head(7).round(5).reset_index(drop=True)
+        top3.index += 1
+        print(top3)
+    else:
+        print("No valid configurations found. Try relaxing constraints.")
+
+    # Plot Relationship between Number of Holes and LMR
+    plot = 1 # Set to 1 to enable plotting
+    if len(results["num_holes"]) > 1 and plot:
+        # Create figure with two subplots
+        plt.figure(figsize=(12, 5))
+
+        # TMR vs Hole Count
+        ax = plt.subplot(1, 2, 1)
+        plot_sweep(ax, results, "num_holes", "TMR", fmt="bo-")
+        plt.xlabel("Number of Holes")
+        plt.ylabel("TMR")
+        plt.title("TMR vs Hole Count")
+        plt.grid(True)
+
+        # LMR vs Hole Count
+        ax = plt.subplot(1, 2, 2)
+        plot_sweep(ax, results, "num_holes", "LMR", fmt="ro-")
+        plt.xlabel("Number of Holes")
+        plt.ylabel("LMR")
+        plt.title("LMR vs Hole Count")
+        plt.grid(True)
+
+        # Add horizontal lines showing target LMR range
+        plt.axhline(y=target_LMR_min, color="gray", linestyle="--")
+        plt.axhline(y=target_LMR_max, color="gray", linestyle="--")
+
+        plt.tight_layout()
+
+        # Save and show plot
+        #plt.savefig("hole_count_vs_momentum_ratios.png", dpi=300)
+        plt.show()
+    else:
+        if plot == 1:
+            print("Not enough data points to generate meaningful plots")
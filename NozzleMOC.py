@@ -0,0 +1,794 @@
+# This code provides a method of characteristics (MOC) nozzle engine to replace the empirical 80% Rao theta tables in
+# BasicSizing and the single Bezier bell in NozzleContour.
+
+# Method:
+# Axisymmetric MOC started from a uniform M = 1.01 line at the throat plane, with the wall on the same 0.382 r_t
+# downstream throat arc NozzleContour uses. Compatibility equations (Zucrow & Hoffman, Anderson "Modern
+# Compressible Flow" ch. 11):
+#   along C-: d(theta + nu) =  sin(theta) / (beta sin(theta) - cos(theta)) * dr/r
+#   along C+: d(theta - nu) = -sin(theta) / (beta sin(theta) + cos(theta)) * dr/r,    beta = sqrt(M^2 - 1)
+# Interior points use one predictor and one corrector pass. The kernel lattice is marched once per gamma, as numpy
+# operations over every gamma at once, and every wall point T on the arc is the arc end (theta_n) of one ideal
+# contour: its C- (TE) reaches the axis at E, which fixes the exit Mach, and past T the wall is the streamline that
+# turns the flow back to axial (mass balance along straight C+ lines from TE). The ideal exits land on the 1-D
+# A/A* of their exit Mach to within ~1%.
+
+# Thrust-optimized contours:
+# Past the arc end N the wall follows Rao's optimum (Rao 1958, "Exhaust nozzle contour for optimum thrust"): a point D
+# on the C- from N (NK) is picked, the exit C+ DE is marched from D with Rao's conditions held constant along it
+#   V cos(theta - mu) / cos(mu) = C1,    r rho V^2 sin(theta)^2 tan(mu) = C2,
+# and the lip E is where DE has carried the mass flow through ND. Sliding D from N towards the axis gives the locus
+# of optimum lips for that theta_n (rao_lips). Vacuum thrust of a lip is the momentum balance of the kernel (initial
+# line force plus arc wall force) minus the force through ND plus the force through DE, so it does not lean on the
+# lattice near the axis either. The wall from N to E (rao_walls) is the streamline of the characteristic net between
+# ND and DE. ideal_contours() still gives the ideal (fully turned) contour for every arc end.
+
+# Truncated contours:
+# For a target ER and length fraction (percent_bell, of the 15 deg cone length as in BasicSizing) each lip locus is
+# cut at that length, and theta_n is picked so the cut radius gives the target ER. theta_e is the lip angle. The
+# vacuum thrust over the 1-D thrust at the same ER gives the divergence efficiency eta_div for the eta_cf estimate.
+# At the Rao table's own points the family lands within ~1 deg of its theta_n and theta_e.
+
+# Coverage:
+# The kernel lattice folds (C- lines from the arc crossing) once the arc end passes ~24-26 deg: the C- lines from the
+# arc run almost parallel to the axis there and cross the C+ coming back from the axis. 2-3x more lattice points or a
+# faster start line move that by well under a degree. Arc ends whose NK runs into the fold are only used with D above
+# it, which caps the family at theta_n ~24-25.5 deg, short of the 26-33 deg the 80% Rao table needs for ER 10-100.
+# Largest ER covered on the grid (ER_GRID runs from 2 to 100):
+#   gamma     70%    80%    90%    100%
+#   1.12      4.7    9.2   13.0   18.3
+#   1.16      3.9    7.8   13.0   15.4
+#   1.20      4.7    9.2   15.4   21.6
+#   1.24      3.9    7.8   13.0   18.3
+#   1.28      2.8    6.6   11.0   15.4
+#   1.33      2.4    5.5    9.2   15.4
+#   1.40      2.8    5.5    9.2   13.0
+# So the family does not replace the Rao table above ER ~6-9 at 80% bell. Designs outside it come back nan from
+# moc_angles, and BasicSizing/NozzleContour/truncated_contour raise for them instead of silently using the Rao table.
+
+# Family cache:
+# solve_family() runs the MOC once over GAMMA_GRID and tabulates theta_n, theta_e, eta_div and the wall radius at
+# WALL_S of the nozzle length on a (gamma, ER, percent_bell) grid. The table is stored with PlotCache, so later runs
+# load it from disk. moc_angles() is a trilinear interpolation, about as cheap as the old np.interp, and
+# truncated_contour() blends the tabulated walls the same way for a whole batch of designs.
+
+# Useful links:
+# https://www.grc.nasa.gov/www/k-12/airplane/prandtl.html
+# http://www.aspirespace.org.uk/downloads/Thrust%20optimised%20parabolic%20nozzle.pdf
+
+# Imports:
+import numpy as np
+from dataclasses import dataclass
+from PlotCache import load_or_compute
+
+ARC_RATIO = 0.382          # Downstream throat arc radius / r_t (same as NozzleContour)
+
+GAMMA_GRID = np.array([1.12, 1.16, 1.20, 1.24, 1.28, 1.33, 1.40])
+ER_GRID = np.geomspace(2, 100, 24)
+PERCENT_BELL_GRID = np.array([0.7, 0.8, 0.9, 1.0])
+N_POINTS = 80             # Characteristic lattice points across the throat
+WALL_S = np.linspace(0, 1, 121)**2      # Tabulated wall points as a fraction of the nozzle length (dense at the throat)
+
+
+# GAS DYNAMICS
+
+def prandtl_meyer(beta, gamma):
+    s = np.sqrt((gamma + 1) / (gamma - 1))
+    return s * np.arctan(beta / s) - np.arctan(beta)
+
+
+# beta = sqrt(M^2 - 1) from the Prandtl-Meyer angle, Newton from the small-angle series nu ~ (1 - 1/s^2) beta^3 / 3
+def beta_from_nu(nu, gamma):
+    s2 = (gamma + 1) / (gamma - 1)
+    nu = np.maximum(nu, 1e-12)
+    beta = np.cbrt(3 * nu / (1 - 1/s2))
+    for _ in range(30):
+        f = prandtl_meyer(beta, gamma) - nu
+        if not np.nanmax(np.abs(f), initial=0) > 1e-13:
+            break
+        df = beta**2 * (1 - 1/s2) / ((1 + beta**2 / s2) * (1 + beta**2))
+        beta = np.clip(beta - f / df, 0.5 * beta, 2 * beta)
+    return beta
+
+
+def pressure_ratio(beta, gamma):
+    return (1 + (gamma - 1) / 2 * (1 + beta**2))**(-gamma / (gamma - 1))
+
+
+# Supersonic Mach number for an area ratio (vectorized bisection)
+def mach_from_er(ER, gamma):
+    lo = np.ones(np.broadcast(ER, gamma).shape)
+    hi = np.full(lo.shape, 50.0)
+    for _ in range(60):
+        M = 0.5 * (lo + hi)
+        ratio = (1 / M) * ((1 + (gamma - 1) / 2 * M**2) / ((gamma + 1) / 2))**((gamma + 1) / (2 * (gamma - 1)))
+        hi = np.where(ratio > ER, M, hi)
+        lo = np.where(ratio > ER, lo, M)
+    return 0.5 * (lo + hi)
+
+
+# 1-D vacuum thrust / (p0 A*) at an area ratio
+def thrust_1d(ER, gamma):
+    M = mach_from_er(ER, gamma)
+    return pressure_ratio(np.sqrt(M**2 - 1), gamma) * ER * (1 + gamma * M**2)
+
+
+# MOC SOLVER
+
+@dataclass
+class IdealContours:
+    gamma: np.ndarray        # (n_contours,)
+    theta_max: np.ndarray    # Arc end angle (theta_n) of each contour [rad]
+    x: np.ndarray            # Wall x / r_t from the throat, (n_contours, n_wall), padded with the exit point
+    r: np.ndarray            # Wall r / r_t
+    theta: np.ndarray        # Wall angle [rad]
+    thrust: np.ndarray       # Vacuum thrust / (p0 pi r_t^2) with the wall cut at each point (nan on the arc)
+    complete: np.ndarray     # False when the lattice broke down before the exit, here or on an earlier contour
+    mass_error: np.ndarray   # Mass flow through TE / initial line mass flow - 1 (nan if TE breaks down)
+    mass_flow: np.ndarray    # Initial line mass flow / 1-D choked mass flow through r_t
+
+
+def _k_minus(theta, beta, r):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.sin(theta) / ((beta * np.sin(theta) - np.cos(theta)) * r)
+    return np.where(r > 0, k, np.nan)
+
+
+def _k_plus(theta, beta, r):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = -np.sin(theta) / ((beta * np.sin(theta) + np.cos(theta)) * r)
+    return np.where(r > 0, k, np.nan)
+
+
+# Mean of two coefficients, falling back to whichever is defined (points on the axis have r = 0)
+def _avg(a, b):
+    return np.where(np.isnan(a), b, np.where(np.isnan(b), a, 0.5 * (a + b)))
+
+
+def _point(x, r, theta, nu, gamma):
+    beta = beta_from_nu(nu, gamma)
+    return {"x": x, "r": r, "theta": theta, "nu": nu, "beta": beta, "mu": np.arctan(1 / beta)}
+
+
+def _take(point, index):
+    return {key: value[..., index] for key, value in point.items()}
+
+
+def _join(*points):
+    return {key: np.concatenate([pt[key][:, None] if pt[key].ndim == 1 else pt[key] for pt in points], axis=1)
+            for key in points[0]}
+
+
+# Interior point from p1 (upstream end of the C-) and p2 (upstream end of the C+)
+def _interior(p1, p2, gamma):
+    p3 = None
+    for _ in range(2):
+        a1 = p1 if p3 is None else {k: 0.5 * (p1[k] + p3[k]) for k in ("theta", "mu")}
+        a2 = p2 if p3 is None else {k: 0.5 * (p2[k] + p3[k]) for k in ("theta", "mu")}
+        m1 = np.tan(a1["theta"] - a1["mu"])
+        m2 = np.tan(a2["theta"] + a2["mu"])
+        x3 = (p2["r"] - p1["r"] + m1 * p1["x"] - m2 * p2["x"]) / (m1 - m2)
+        r3 = p1["r"] + m1 * (x3 - p1["x"])
+
+        k_minus = _k_minus(p1["theta"], p1["beta"], p1["r"])
+        k_plus = _k_plus(p2["theta"], p2["beta"], p2["r"])
+        if p3 is not None:
+            k_minus = _avg(k_minus, _k_minus(p3["theta"], p3["beta"], r3))
+            k_plus = _avg(k_plus, _k_plus(p3["theta"], p3["beta"], r3))
+        k_plus = np.nan_to_num(k_plus)
+
+        riemann_minus = p1["theta"] + p1["nu"] + k_minus * (r3 - p1["r"])
+        riemann_plus = p2["theta"] - p2["nu"] + k_plus * (r3 - p2["r"])
+        p3 = _point(x3, r3, 0.5 * (riemann_minus + riemann_plus), 0.5 * (riemann_minus - riemann_plus), gamma)
+    return p3
+
+
+# Axis point (theta = 0, r = 0) at the end of the C- from p1
+def _axis(p1, gamma):
+    m1 = np.tan(p1["theta"] - p1["mu"])
+    x3 = p1["x"] - p1["r"] / m1
+    nu3 = p1["theta"] + p1["nu"] - _k_minus(p1["theta"], p1["beta"], p1["r"]) * p1["r"]
+    return _point(x3, np.zeros_like(x3), np.zeros_like(x3), nu3, gamma)
+
+
+# Wall point on the throat arc at the end of the C+ from p (wall angle fixed by the arc)
+def _arc_wall(p, gamma):
+    R = ARC_RATIO
+    slope = p["theta"] + p["mu"]
+    k_plus = np.nan_to_num(_k_plus(p["theta"], p["beta"], p["r"]))
+    w = None
+    for _ in range(2):
+        m = np.tan(slope)
+        x = np.clip(p["x"], 0, 0.999 * R)
+        for _ in range(8):
+            root = np.sqrt(R**2 - x**2)
+            x = np.clip(x - (p["r"] + m * (x - p["x"]) - (1 + R - root)) / (m - x / root), 0, 0.999 * R)
+        r = 1 + R - np.sqrt(R**2 - x**2)
+        theta = np.arcsin(x / R)
+        k = k_plus if w is None else _avg(k_plus, _k_plus(theta, w["beta"], r))
+        w = _point(x, r, theta, theta - (p["theta"] - p["nu"] + k * (r - p["r"])), gamma)
+        slope = 0.5 * (p["theta"] + p["mu"] + w["theta"] + w["mu"])
+    return w
+
+
+# Mass flux / (rho0 a0) crossing the straight segments between consecutive points (last axis)
+def _segment_mass(a, b, gamma):
+    def flux(pt):
+        M2 = 1 + pt["beta"]**2
+        t = 1 + (gamma - 1) / 2 * M2
+        rho_v = t**(-1 / (gamma - 1)) * np.sqrt(M2 / t)
+        return rho_v * np.cos(pt["theta"]), rho_v * np.sin(pt["theta"])
+
+    (ca, sa), (cb, sb) = flux(a), flux(b)
+    return np.pi * (a["r"] + b["r"]) * (0.5 * (ca + cb) * (b["r"] - a["r"]) - 0.5 * (sa + sb) * (b["x"] - a["x"]))
+
+
+# Axial momentum + pressure force / (p0 pi r_t^2) through the same segments
+def _segment_force(a, b, gamma):
+    def flux(pt):
+        M2 = 1 + pt["beta"]**2
+        p = pressure_ratio(pt["beta"], gamma)
+        return p * (1 + gamma * M2 * np.cos(pt["theta"])**2), gamma * p * M2 * np.cos(pt["theta"]) * np.sin(pt["theta"])
+
+    (ca, sa), (cb, sb) = flux(a), flux(b)
+    return (a["r"] + b["r"]) * (0.5 * (ca + cb) * (b["r"] - a["r"]) - 0.5 * (sa + sb) * (b["x"] - a["x"]))
+
+
+# Throat kernel for each gamma: march from a uniform line at the throat plane (Mach M0, n_points from axis to wall).
+# Each step builds a staggered row of interior points, then a full row of axis point, interior points and arc wall
+# point. Returns the full rows stacked as (n_rows, n_gamma, n_points) and the initial line mass flow and force.
+def _kernel(gamma, n_points, M0, theta_limit):
+    g = gamma[:, None]
+    beta_0 = np.sqrt(M0**2 - 1)
+    row = _point(np.zeros((len(gamma), n_points)), np.tile(np.linspace(0, 1, n_points), (len(gamma), 1)),
+                 np.zeros((len(gamma), n_points)), prandtl_meyer(beta_0, g) * np.ones((1, n_points)), g)
+    mass_0 = np.sum(_segment_mass(_take(row, slice(None, -1)), _take(row, slice(1, None)), g), axis=1)
+    force_0 = np.sum(_segment_force(_take(row, slice(None, -1)), _take(row, slice(1, None)), g), axis=1)
+
+    rows = [row]
+    extra = None
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        while extra is None or extra > 0:
+            mid = _interior(_take(row, slice(1, None)), _take(row, slice(None, -1)), g)
+            inner = _interior(_take(mid, slice(1, None)), _take(mid, slice(None, -1)), g)
+            row = _join(_axis(_take(mid, 0), gamma), inner, _arc_wall(_take(mid, -1), gamma))
+            rows.append(row)
+            if extra is None and np.all(row["theta"][:, -1] > theta_limit):
+                extra = n_points - 1
+            elif extra is not None:
+                extra -= 1
+    return {key: np.stack([rw[key] for rw in rows]) for key in row}, mass_0, force_0
+
+
+# Lattice points in the domain of influence of a folded cell. Every characteristic diamond (a point, its C+ and C-
+# neighbours on the next row and the point after both) keeps one orientation until C- lines of the kernel cross;
+# the diamond that turns inside out (or goes nan) and everything downstream of it is masked.
+def _fold_mask(rows):
+    x, r = rows["x"], rows["r"]
+    corners = [(x[:-2, :, 1:-1], r[:-2, :, 1:-1]), (x[1:-1, :, 2:], r[1:-1, :, 2:]),
+               (x[2:, :, 1:-1], r[2:, :, 1:-1]), (x[1:-1, :, :-2], r[1:-1, :, :-2])]
+    with np.errstate(invalid="ignore"):
+        area = sum(xa * rb - xb * ra for (xa, ra), (xb, rb) in zip(corners, corners[1:] + corners[:1]))
+        folded = ~(np.isfinite(x) & np.isfinite(r) & np.isfinite(rows["beta"]))
+        folded[2:, :, 1:-1] |= ~(area < 0)
+    for k in range(1, len(x)):
+        folded[k] |= folded[k - 1]
+        folded[k, :, 1:] |= folded[k - 1, :, :-1]
+        folded[k, :, :-1] |= folded[k - 1, :, 1:]
+    return folded
+
+
+# Axial pressure force / (p0 pi r_t^2) on the arc wall from the throat up to each row, (n_rows, n_gamma)
+def _arc_force(rows, gamma):
+    wall_p = pressure_ratio(rows["beta"][:, :, -1], gamma)
+    return np.concatenate([np.zeros((1, len(gamma))), np.cumsum(
+        0.5 * (wall_p[1:] + wall_p[:-1]) * np.diff(rows["r"][:, :, -1]**2, axis=0), axis=0)])
+
+
+# Candidate arc ends as (row, gamma index): wall points of rows 1 .. n_rows - n_points (their C- reaches the axis
+# inside the kernel) up to theta_limit
+def _arc_ends(rows, n_points, theta_limit):
+    cand_row, cand_g = np.meshgrid(np.arange(1, rows["x"].shape[0] - n_points + 1), np.arange(rows["x"].shape[1]),
+                                   indexing="ij")
+    cand_row, cand_g = cand_row.ravel(), cand_g.ravel()
+    keep = rows["theta"][cand_row, cand_g, -1] <= theta_limit
+    return cand_row[keep], cand_g[keep]
+
+
+# C- from each arc end through the lattice, from the axis (u = 0) up to the arc end (u = n_points - 1), linear
+# between lattice points with `refine` points per lattice cell
+def _arc_end_characteristic(rows, cand_row, cand_g, n_points, refine, keys=("x", "r", "theta", "nu")):
+    n = n_points
+    u = np.linspace(0, n - 1, refine * (n - 1) + 1)
+    i = np.minimum(u.astype(int), n - 2)
+    w = (u - i)[None, :]
+    out = {}
+    for key in keys:
+        lower = rows[key][cand_row[:, None] + (n - 1 - i)[None, :], cand_g[:, None], i[None, :]]
+        upper = rows[key][cand_row[:, None] + (n - 2 - i)[None, :], cand_g[:, None], i[None, :] + 1]
+        out[key] = (1 - w) * lower + w * upper
+    return out
+
+
+# Ideal contours for each gamma, r_t = 1. Every arc wall point T of the kernel (up to theta_limit) is the arc end
+# of one contour. Its C- (TE) runs through the kernel lattice to the axis at E. Past T the wall turns the flow back
+# to axial: the C+ from each TE point is taken as straight with the state of that point (simple region, exact in
+# planar flow), and the wall point is where that C+ has passed the mass flowing through TE above it. The C+ from E
+# is uniform, so the last wall point is the exit with M(E). TE is resampled `refine` times finer than the lattice.
+def ideal_contours(gamma, n_points=N_POINTS, M0=1.01, theta_limit=np.deg2rad(45), refine=8):
+    gamma = np.atleast_1d(np.asarray(gamma, dtype=float))
+    n = n_points
+    rows, mass_0, force_0 = _kernel(gamma, n, M0, theta_limit)
+    cand_row, cand_g = _arc_ends(rows, n, theta_limit)
+    g = gamma[cand_g][:, None]
+
+    te = _arc_end_characteristic(rows, cand_row, cand_g, n, refine)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        te = _point(te["x"], te["r"], te["theta"], te["nu"], g)
+        arc_force = _arc_force(rows, gamma)
+        te_mass = _segment_mass(_take(te, slice(None, -1)), _take(te, slice(1, None)), g)
+        target = np.cumsum(te_mass[:, ::-1], axis=1)[:, ::-1]
+
+        # Wall point on the straight C+ from each TE point below T
+        p = _take(te, slice(None, -1))
+        M2 = 1 + p["beta"]**2
+        t = 1 + (g - 1) / 2 * M2
+        rho_v = t**(-1 / (g - 1)) * np.sqrt(M2 / t)
+        alpha = p["theta"] + p["mu"]
+        a = np.pi * rho_v * np.sin(p["mu"]) * np.sin(alpha)
+        b = 2 * np.pi * rho_v * np.sin(p["mu"]) * p["r"]
+        s = 2 * target / (b + np.sqrt(b**2 + 4 * a * target))
+        turn = {"x": p["x"] + s * np.cos(alpha), "r": p["r"] + s * np.sin(alpha), "theta": p["theta"],
+                "beta": p["beta"]}
+
+        # Vacuum thrust if the wall is cut at each turning wall point: the force through TE from E up to the C+
+        # foot plus the force through the C+ itself, both upstream of the C- from the lip so the cut does not change
+        # the flow there. The part of TE below the foot is taken from the momentum balance of the kernel (initial
+        # line force plus the arc wall pressure force is the force through all of TE), so the thrust only uses the
+        # lattice between the foot and the wall.
+        te_force = _segment_force(_take(te, slice(None, -1)), _take(te, slice(1, None)), g)
+        above = np.cumsum(te_force[:, ::-1], axis=1)[:, ::-1]
+        turn["thrust"] = (force_0[cand_g] + arc_force[cand_row, cand_g])[:, None] - above \
+            + _segment_force(p, dict(p, x=turn["x"], r=turn["r"]), g)
+
+        # A wall point is only as good as TE above its foot: every segment up to T must carry mass downstream
+        segment_ok = (te_mass > 0) & (np.diff(te["x"], axis=1) < 0) & np.isfinite(te_force)
+        te_ok = np.cumprod(segment_ok[:, ::-1], axis=1)[:, ::-1].astype(bool)
+        turn = {key: np.where(te_ok, value, np.nan) for key, value in turn.items()}
+        turn = {key: value[:, ::-1] for key, value in turn.items()}
+
+    # Arc wall up to T followed by the turning wall. For a large theta_max the C- from T runs almost parallel to the
+    # axis and the lattice breaks down near E, but each wall point only depends on TE above it, so the wall is kept
+    # up to its last good point and padded with that point (cuts past it are rejected by truncate)
+    arc_len = cand_row + 1
+    n_turn = turn["x"].shape[1]
+    n_wall = arc_len.max() + n_turn
+    q = np.arange(n_wall)[None, :]
+    index = np.minimum(q, arc_len[:, None] - 1)
+    tail = np.clip(q - arc_len[:, None], 0, n_turn - 1)
+    out = {}
+    rows["thrust"] = np.full(rows["x"].shape, np.nan)
+    for key in ("x", "r", "theta", "beta", "thrust"):
+        arc = rows[key][index, cand_g[:, None], -1]
+        out[key] = np.where(q < arc_len[:, None], arc, np.take_along_axis(turn[key], tail, axis=1))
+
+    good = np.isfinite(out["x"]) & np.isfinite(out["r"]) & np.isfinite(out["beta"])
+    good[:, 1:] &= np.diff(out["x"], axis=1) >= 0
+
+    # Once the lattice has folded (C- lines of the kernel crossing near the axis, from theta_max ~23-26 deg
+    # depending on gamma) every later arc end lies downstream of the fold, so only the contours before the first
+    # broken one are kept. The last of those passes next to the fold and its exit blows up (ER 100-300 where its
+    # neighbours follow a smooth 40-60), so it is dropped too.
+    complete = good.all(axis=1)
+    for k in range(len(gamma)):
+        same = np.flatnonzero(cand_g == k)
+        ok = np.cumprod(complete[same]).astype(bool)
+        ok[:-1] &= ok[1:]
+        complete[same] = ok
+    last_good = np.where(good.all(axis=1), n_wall - 1, np.argmin(np.cumprod(good, axis=1), axis=1) - 1)
+    pad = np.minimum(q, last_good[:, None])
+    out = {key: np.take_along_axis(value, pad, axis=1) for key, value in out.items()}
+
+    return IdealContours(
+        gamma=g[:, 0],
+        theta_max=rows["theta"][cand_row, cand_g, -1],
+        x=out["x"],
+        r=out["r"],
+        theta=out["theta"],
+        thrust=out["thrust"],
+        complete=complete,
+        mass_error=target[:, 0] / mass_0[cand_g] - 1,
+        mass_flow=mass_0[cand_g] / (np.pi * (2 / (g[:, 0] + 1))**((g[:, 0] + 1) / (2 * (g[:, 0] - 1)))),
+    )
+
+
+# Divergence efficiency, radius and wall angle of each contour cut at x_cut (r_t = 1). The efficiency is the vacuum
+# thrust over the 1-D thrust at the same ER, both per unit of the initial line mass flow (the complete ideal contours
+# come out at 0.998-1.000).
+def truncate(contours, x_cut):
+    x_cut = np.broadcast_to(np.asarray(x_cut, dtype=float), contours.gamma.shape)
+    x = contours.x
+    valid = (x_cut <= x[:, -1]) & contours.complete
+
+    j = np.clip(np.sum(x <= x_cut[:, None], axis=1) - 1, 0, x.shape[1] - 2)[:, None]
+    x_lo, x_hi = np.take_along_axis(x, j, axis=1)[:, 0], np.take_along_axis(x, j + 1, axis=1)[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = np.where(x_hi > x_lo, (x_cut - x_lo) / (x_hi - x_lo), 0)
+
+    def at_cut(values):
+        lo, hi = np.take_along_axis(values, j, axis=1)[:, 0], np.take_along_axis(values, j + 1, axis=1)[:, 0]
+        return np.where(valid, lo + w * (hi - lo), np.nan)
+
+    r_cut = at_cut(contours.r)
+    mass = contours.mass_flow
+    eta_div = at_cut(contours.thrust) / (mass * thrust_1d(r_cut**2 / mass, contours.gamma))
+    return eta_div, r_cut, at_cut(contours.theta)
+
+
+# Nozzle length / r_t used by BasicSizing for a given ER and percent bell
+def bell_length(ER, percent_bell):
+    return percent_bell * (np.sqrt(ER) - 1) / np.tan(np.deg2rad(15))
+
+
+# Neighbouring contours of one gamma (in theta_max order) whose cuts at x_cut bracket the target ER, and the blend
+# weight between them. The first bracketing pair is the smallest theta_n that reaches ER.
+def _bracket_contours(er_cut, ER):
+    lo = np.flatnonzero((er_cut[:-1] <= ER) & (ER <= er_cut[1:]))
+    if len(lo) == 0:
+        return None
+    lo = lo[0]
+    return lo, lo + 1, (ER - er_cut[lo]) / (er_cut[lo + 1] - er_cut[lo])
+
+
+# THRUST-OPTIMIZED (RAO) CONTOURS
+
+@dataclass
+class RaoLips:
+    gamma: np.ndarray        # (n_contours,), one per arc end N
+    theta_max: np.ndarray    # Arc end angle (theta_n) [rad]
+    x: np.ndarray            # Lip x / r_t for D at each point of arc_end, from D = N down towards the axis,
+                             # (n_contours, n_nk), padded with the last good lip
+    r: np.ndarray            # Lip r / r_t
+    theta: np.ndarray        # Flow angle at the lip (= wall angle theta_e) [rad]
+    thrust: np.ndarray       # Vacuum thrust / (p0 pi r_t^2) of the nozzle ending at each lip
+    u: np.ndarray            # Index of D in arc_end
+    complete: np.ndarray     # False when fewer than two lips are good
+    mass_flow: np.ndarray    # Initial line mass flow / 1-D choked mass flow through r_t
+    arc_end: dict            # NK (x, r, theta, nu) from the axis to N, `refine` points per lattice cell, (n_contours, n_nk)
+
+
+# Rao's two constants along the exit characteristic: V cos(theta - mu) / cos(mu) and log(r rho V^2 sin^2 theta tan mu)
+# (V / a0, rho / rho0)
+def _rao_constants(theta, beta, r, gamma):
+    M2 = 1 + beta**2
+    t = 1 + (gamma - 1) / 2 * M2
+    V = np.sqrt(M2 / t)
+    return V * (np.cos(theta) + np.sin(theta) / beta), \
+        np.log(r) - np.log(t) / (gamma - 1) + np.log(M2 / t) + 2 * np.log(np.sin(theta)) - np.log(beta)
+
+
+# Next point of the exit characteristic at radius r: theta and beta from the two constants (Newton from the
+# previous point), x from the C+ slope
+def _rao_step(p, r, gamma, c1, c2):
+    theta, beta = p["theta"], p["beta"]
+    for _ in range(4):
+        M2 = 1 + beta**2
+        t = 1 + (gamma - 1) / 2 * M2
+        V = np.sqrt(M2 / t)
+        f1, f2 = _rao_constants(theta, beta, r, gamma)
+        f1, f2 = f1 - c1, f2 - c2
+        dlog_v = beta / M2 - (gamma - 1) * beta / (2 * t)
+        j11 = V * (np.cos(theta) / beta - np.sin(theta))
+        j12 = V * dlog_v * (np.cos(theta) + np.sin(theta) / beta) - V * np.sin(theta) / beta**2
+        j21 = 2 / np.tan(theta)
+        j22 = 2 * dlog_v - beta / t - 1 / beta
+        det = j11 * j22 - j12 * j21
+        theta, beta = theta - (j22 * f1 - j12 * f2) / det, beta - (j11 * f2 - j21 * f1) / det
+    mu = np.arctan(1 / beta)
+    x = p["x"] + (r - p["r"]) * 0.5 * (1 / np.tan(p["theta"] + p["mu"]) + 1 / np.tan(theta + mu))
+    return {"x": x, "r": r, "theta": theta, "nu": prandtl_meyer(beta, gamma), "beta": beta, "mu": mu}
+
+
+# Lip at the end of the exit characteristic DE from each D (1-D arrays): DE is marched out in r (steps of
+# step * max(r, r_t)) until it has carried `target` mass flow, the mass flowing through ND. Returns the lip state
+# and the force through DE.
+def _exit_characteristic(D, target, gamma, step=0.02):
+    c1, c2 = _rao_constants(D["theta"], D["beta"], D["r"], gamma)
+    lip = {key: np.where(target > 0, np.nan, D[key]) for key in ("x", "r", "theta", "beta")}
+    lip["force"] = np.where(target > 0, np.nan, 0.0)
+
+    live = np.flatnonzero(target > 0)
+    p = {key: value[live] for key, value in D.items()}
+    mass = np.zeros(len(live))
+    force = np.zeros(len(live))
+    while len(live):
+        q = _rao_step(p, p["r"] + step * np.maximum(p["r"], 1), gamma[live], c1[live], c2[live])
+        dm = _segment_mass(p, q, gamma[live])
+        df = _segment_force(p, q, gamma[live])
+        hit = mass + dm >= target[live]
+        w = (target[live] - mass) / dm
+        for key in ("x", "r", "theta", "beta"):
+            lip[key][live[hit]] = (p[key] + w * (q[key] - p[key]))[hit]
+        lip["force"][live[hit]] = (force + w * df)[hit]
+
+        # Lines that stop carrying mass downstream (Newton lost, or DE turned back) never reach a lip
+        going = ~hit & (dm > 0) & (q["theta"] > 0) & (q["beta"] > 0)
+        live, mass, force = live[going], (mass + dm)[going], (force + df)[going]
+        p = {key: value[going] for key, value in q.items()}
+    return lip
+
+
+# Exit characteristics from D out to r_end in n_steps equal steps, as (n_lines, n_steps + 1) arrays
+def _exit_line(D, r_end, gamma, n_steps):
+    c1, c2 = _rao_constants(D["theta"], D["beta"], D["r"], gamma)
+    points = [D]
+    for k in range(1, n_steps + 1):
+        points.append(_rao_step(points[-1], D["r"] + (r_end - D["r"]) * k / n_steps, gamma, c1, c2))
+    return {key: np.stack([pt[key] for pt in points], axis=1) for key in D}
+
+
+# Lips of the thrust-optimized contours for each gamma (r_t = 1). Every arc wall point N of the kernel (up to
+# theta_limit) is the arc end of a family of Rao contours, one per point D on its C- (NK): DE is marched out of D
+# with Rao's constants and the lip E is where DE carries the mass flowing through ND. The vacuum thrust is the force
+# through NK below D plus the force through DE. The NK part is the force through all of NK from the momentum
+# balance of the kernel (initial line force plus arc wall pressure force) minus the force through ND, so only the
+# lattice above D is used, and D is only taken where ND is clear of the lattice fold.
+def rao_lips(gamma, n_points=N_POINTS, M0=1.01, theta_limit=np.deg2rad(45), refine=4, step=0.02):
+    gamma = np.atleast_1d(np.asarray(gamma, dtype=float))
+    n = n_points
+    rows, mass_0, force_0 = _kernel(gamma, n, M0, theta_limit)
+    rows["fold"] = _fold_mask(rows).astype(float)
+    cand_row, cand_g = _arc_ends(rows, n, theta_limit)
+    g = gamma[cand_g][:, None]
+
+    nk = _arc_end_characteristic(rows, cand_row, cand_g, n, refine, ("x", "r", "theta", "nu", "fold"))
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        nk_point = _point(nk["x"], nk["r"], nk["theta"], nk["nu"], g)
+        nk_mass = _segment_mass(_take(nk_point, slice(None, -1)), _take(nk_point, slice(1, None)), g)
+        nk_force = _segment_force(_take(nk_point, slice(None, -1)), _take(nk_point, slice(1, None)), g)
+        nd_mass = np.concatenate([np.cumsum(nk_mass[:, ::-1], axis=1)[:, ::-1], np.zeros_like(g)], axis=1)
+        nd_force = np.concatenate([np.cumsum(nk_force[:, ::-1], axis=1)[:, ::-1], np.zeros_like(g)], axis=1)
+
+        # D and all of ND above it clear of the fold (with one lattice cell to spare below D, the lattice next to
+        # the fold is already off), moving away from the axis and carrying mass downstream
+        fold = np.concatenate([np.ones((len(g), refine)), nk["fold"][:, :-refine]], axis=1) + nk["fold"]
+        ok = (fold == 0) & (nk["theta"] > 0) & \
+            np.append((nk_mass > 0) & (np.diff(nk["r"], axis=1) > 0), np.ones_like(g, dtype=bool), axis=1)
+        clear = np.cumprod(ok[:, ::-1], axis=1)[:, ::-1].astype(bool)
+
+        D = {key: value[clear] for key, value in nk_point.items()}
+        lip = _exit_characteristic(D, nd_mass[clear], np.broadcast_to(g, clear.shape)[clear], step)
+        out = {key: np.full(clear.shape, np.nan) for key in lip}
+        for key, value in lip.items():
+            out[key][clear] = value
+        out["thrust"] = (force_0[cand_g] + _arc_force(rows, gamma)[cand_row, cand_g])[:, None] - nd_force + out["force"]
+
+    # From D at N down towards the axis the lips move out and downstream and the lip angle drops; past the first lip
+    # that doesn't (or D in the fold) the locus is padded with the last good lip
+    out = {key: out[key][:, ::-1] for key in ("x", "r", "theta", "thrust")}
+    good = np.isfinite(out["x"]) & np.isfinite(out["r"]) & np.isfinite(out["theta"]) & np.isfinite(out["thrust"])
+    good[:, 1:] &= (np.diff(out["x"], axis=1) > 0) & (np.diff(out["r"], axis=1) > 0) & \
+        (np.diff(out["theta"], axis=1) <= 0)
+    good = np.cumprod(good, axis=1).astype(bool)
+    last_good = np.maximum(np.sum(good, axis=1) - 1, 0)
+    pad = np.minimum(np.arange(good.shape[1])[None, :], last_good[:, None])
+    out = {key: np.take_along_axis(value, pad, axis=1) for key, value in out.items()}
+
+    return RaoLips(
+        gamma=g[:, 0],
+        theta_max=rows["theta"][cand_row, cand_g, -1],
+        x=out["x"],
+        r=out["r"],
+        theta=out["theta"],
+        thrust=out["thrust"],
+        u=(good.shape[1] - 1 - pad).astype(float),
+        complete=good.sum(axis=1) >= 2,
+        mass_flow=mass_0[cand_g] / (np.pi * (2 / (g[:, 0] + 1))**((g[:, 0] + 1) / (2 * (g[:, 0] - 1)))),
+        arc_end={key: nk[key] for key in ("x", "r", "theta", "nu")},
+    )
+
+
+# Rao walls from the arc end N to the lip for lips[index] with D at u on NK and the lip at r_lip, as (x, r) arrays
+# (n_designs, n_net) from N to the lip. ND and DE are resampled to n_net points and the characteristic net between
+# them is marched one diagonal at a time (Goursat problem). On each C- of the net the wall is where the C- has carried
+# the mass that still has to cross DE above it.
+def rao_walls(lips, index, u, r_lip, n_net=80):
+    n = lips.arc_end["x"].shape[1]
+    g = lips.gamma[index][:, None]
+    uu = u[:, None] + (n - 1 - u[:, None]) * np.linspace(0, 1, n_net)[None, :]
+    i = np.clip(uu.astype(int), 0, n - 2)
+    w = uu - i
+    nd = {key: (1 - w) * np.take_along_axis(value[index], i, axis=1) + w * np.take_along_axis(value[index], i + 1, axis=1)
+          for key, value in lips.arc_end.items()}
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        nd = _point(nd["x"], nd["r"], nd["theta"], nd["nu"], g)
+        de = _exit_line(_take(nd, 0), r_lip, g[:, 0], n_net - 1)
+
+        # net[key][:, i, j] sits on the C+ from ND point i and the C- through DE point j
+        net = {key: np.full((len(index), n_net, n_net), np.nan) for key in nd}
+        for key in net:
+            net[key][:, :, 0] = nd[key]
+            net[key][:, 0, :] = de[key]
+        for d in range(2, 2 * n_net - 1):
+            i = np.arange(max(1, d - n_net + 1), min(n_net - 1, d - 1) + 1)
+            p3 = _interior({key: value[:, i - 1, d - i] for key, value in net.items()},
+                           {key: value[:, i, d - i - 1] for key, value in net.items()}, g)
+            for key in net:
+                net[key][:, i, d - i] = p3[key]
+
+        # Mass crossing each C- from DE up to every net point, and the mass still to cross DE above each C-
+        along = _segment_mass(_take_net(net, slice(None, -1)), _take_net(net, slice(1, None)), g[:, :, None])
+        along = np.concatenate([np.zeros((len(index), 1, n_net)), np.cumsum(along, axis=1)], axis=1)
+        de_mass = np.concatenate([np.zeros((len(index), 1)), np.cumsum(
+            _segment_mass(_take(de, slice(None, -1)), _take(de, slice(1, None)), g), axis=1)], axis=1)
+        target = along[:, -1, :1] * (1 - de_mass / de_mass[:, -1:])
+
+        # Next to N the wall runs into the C+ from N, where the crossing can be lost in round-off
+        passed = along >= target[:, None, :]
+        passed[:, -1, :] = True
+        hi = np.argmax(passed, axis=1)[:, None, :]
+        lo = np.maximum(hi - 1, 0)
+        m_lo, m_hi = np.take_along_axis(along, lo, axis=1), np.take_along_axis(along, hi, axis=1)
+        f = np.where(m_hi > m_lo, (target[:, None, :] - m_lo) / (m_hi - m_lo), 0)
+        wall = [(np.take_along_axis(net[key], lo, axis=1) + f * (np.take_along_axis(net[key], hi, axis=1)
+                                                                - np.take_along_axis(net[key], lo, axis=1)))[:, 0, :]
+                for key in ("x", "r")]
+    return wall[0], wall[1]
+
+
+def _take_net(net, index):
+    return {key: value[:, index, :] for key, value in net.items()}
+
+
+# FAMILY TABLE
+
+def _solve_family(gamma_grid, er_grid, percent_bell_grid, n_points):
+    n_g, n_e, n_p = len(gamma_grid), len(er_grid), len(percent_bell_grid)
+    lips = rao_lips(gamma_grid, n_points)
+
+    theta_n = np.full((n_g, n_e, n_p), np.nan)
+    theta_e = np.full((n_g, n_e, n_p), np.nan)
+    eta_div = np.full((n_g, n_e, n_p), np.nan)
+    designs = []
+    for ie, ER in enumerate(er_grid):
+        for ip, pb in enumerate(percent_bell_grid):
+            x_cut = bell_length(ER, pb)
+            eff, r_cut, theta_cut = truncate(lips, x_cut)
+            for ig, gamma in enumerate(gamma_grid):
+                same = np.flatnonzero(lips.gamma == gamma)
+                found = _bracket_contours(r_cut[same]**2, ER)
+                if found is None:
+                    continue
+                lo, hi, w = same[found[0]], same[found[1]], found[2]
+                theta_n[ig, ie, ip] = (1 - w) * lips.theta_max[lo] + w * lips.theta_max[hi]
+                theta_e[ig, ie, ip] = (1 - w) * theta_cut[lo] + w * theta_cut[hi]
+                eta_div[ig, ie, ip] = (1 - w) * eff[lo] + w * eff[hi]
+                designs.append((ig, ie, ip, lo, hi, w, x_cut, r_cut[lo], r_cut[hi]))
+
+    # Walls of both bracketing contours at every covered grid point, blended the same way and sampled at WALL_S of
+    # the nozzle length
+    wall_r = np.full((n_g, n_e, n_p, len(WALL_S)), np.nan)
+    if designs:
+        ig, ie, ip, lo, hi, w, x_cut, r_lo, r_hi = (np.array(column) for column in zip(*designs))
+        index = np.concatenate([lo, hi])
+        x_cut = np.concatenate([x_cut, x_cut])
+        u = np.array([np.interp(x, lips.x[k], lips.u[k]) for k, x in zip(index, x_cut)])
+        x_wall, r_wall = rao_walls(lips, index, u, np.concatenate([r_lo, r_hi]))
+        r = np.array([_wall_radius(lips.theta_max[k], x_wall[j], r_wall[j], x_cut[j] * WALL_S)
+                      for j, k in enumerate(index)])
+        wall_r[ig, ie, ip] = (1 - w)[:, None] * r[:len(lo)] + w[:, None] * r[len(lo):]
+
+    return {"theta_n": np.rad2deg(theta_n), "theta_e": np.rad2deg(theta_e), "eta_div": eta_div, "wall_r": wall_r}
+
+
+# Wall radius at x (r_t = 1): the throat arc up to theta_n, then the Rao wall from N to the lip (nan if the wall
+# came out of the net broken)
+def _wall_radius(theta_n, x_wall, r_wall, x):
+    arc = np.linspace(0, theta_n, 40)
+    xs = np.concatenate([ARC_RATIO * np.sin(arc), x_wall[1:]])
+    rs = np.concatenate([1 + ARC_RATIO * (1 - np.cos(arc)), r_wall[1:]])
+    if not (np.all(np.isfinite(xs)) and np.all(np.isfinite(rs)) and np.all(np.diff(xs) > 0)):
+        return np.full(len(x), np.nan)
+    return np.interp(x, xs, rs)
+
+
+# Family table for the default grids, solved once and then read from the sweep cache
+def solve_family(gamma_grid=GAMMA_GRID, er_grid=ER_GRID, percent_bell_grid=PERCENT_BELL_GRID, n_points=N_POINTS):
+    inputs = dict(gamma_grid=np.asarray(gamma_grid, dtype=float), er_grid=np.asarray(er_grid, dtype=float),
+                  percent_bell_grid=np.asarray(percent_bell_grid, dtype=float), n_points=n_points)
+    table = load_or_compute("moc_family", inputs, _solve_family)
+    table.update(gamma_grid=inputs["gamma_grid"], er_grid=inputs["er_grid"],
+                 percent_bell_grid=inputs["percent_bell_grid"])
+    return table
+
+
+_family = None
+
+
+def _table():
+    global _family
+    if _family is None:
+        _family = solve_family()
+    return _family
+
+
+# Index and weight of each value inside a sorted grid (nan weight outside the grid)
+def _bracket(grid, values):
+    i = np.clip(np.searchsorted(grid, values) - 1, 0, len(grid) - 2)
+    w = (values - grid[i]) / (grid[i + 1] - grid[i])
+    return i, np.where((values >= grid[0]) & (values <= grid[-1]), w, np.nan)
+
+
+# Corners with zero weight are skipped, so a design on a grid line next to an uncovered cell keeps its value. Tables
+# with a trailing axis (the wall profiles) are blended along it as a whole.
+def _trilinear(table, g, e, p):
+    (ig, wg), (ie, we), (ip, wp) = g, e, p
+    out = 0.0
+    for dg, fg in ((0, 1 - wg), (1, wg)):
+        for de, fe in ((0, 1 - we), (1, we)):
+            for dp, fp in ((0, 1 - wp), (1, wp)):
+                corner = table[ig + dg, ie + de, ip + dp]
+                f = np.reshape(fg * fe * fp, np.shape(fg * fe * fp) + (1,) * (corner.ndim - np.ndim(ig)))
+                out = out + np.where(f == 0, 0.0, f * corner)
+    return out
+
+
+# theta_n [deg], theta_e [deg] and divergence efficiency for a batch of designs (ER interpolated in log space)
+def moc_angles(gamma, ER, percent_bell=0.8):
+    family = _table()
+    gamma, ER, percent_bell = np.broadcast_arrays(np.asarray(gamma, dtype=float), np.asarray(ER, dtype=float),
+                                                  np.asarray(percent_bell, dtype=float))
+    g = _bracket(family["gamma_grid"], gamma)
+    e = _bracket(np.log(family["er_grid"]), np.log(ER))
+    p = _bracket(family["percent_bell_grid"], percent_bell)
+    return (_trilinear(family["theta_n"], g, e, p), _trilinear(family["theta_e"], g, e, p),
+            _trilinear(family["eta_div"], g, e, p))
+
+
+# Divergence loss (1 - eta_div) to fold into eta_cf
+def divergence_loss(gamma, ER, percent_bell=0.8):
+    return 1 - moc_angles(gamma, ER, percent_bell)[2]
+
+
+# Truncated Rao walls from the throat to the exit for a batch of designs, scaled to r_t [m], as x and r arrays shaped
+# (designs..., n_out). The tabulated walls of the neighbouring grid points are blended like moc_angles does and
+# stretched radially so the wall ends on the exact exit radius.
+def truncated_contour(gamma, ER, percent_bell, r_t, n_out=200):
+    family = _table()
+    gamma, ER, percent_bell, r_t = np.broadcast_arrays(np.asarray(gamma, dtype=float), np.asarray(ER, dtype=float),
+                                                       np.asarray(percent_bell, dtype=float), np.asarray(r_t, dtype=float))
+    r = _trilinear(family["wall_r"], _bracket(family["gamma_grid"], gamma), _bracket(np.log(family["er_grid"]), np.log(ER)),
+                   _bracket(family["percent_bell_grid"], percent_bell))
+    outside = ~np.all(np.isfinite(r), axis=-1)
+    if np.any(outside):
+        raise ValueError(f"{np.sum(outside)} of {outside.size} designs are outside the MOC family (see NozzleMOC "
+                         f"coverage), first: gamma {gamma[outside].flat[0]}, ER {ER[outside].flat[0]:.3g}, "
+                         f"{percent_bell[outside].flat[0]:.0%} bell")
+
+    r = 1 + (r - 1) * (np.sqrt(ER)[..., None] - 1) / (r[..., -1:] - 1)
+    s = np.linspace(0, 1, n_out)
+    j = np.clip(np.searchsorted(WALL_S, s) - 1, 0, len(WALL_S) - 2)
+    f = (s - WALL_S[j]) / (WALL_S[j + 1] - WALL_S[j])
+    r = (1 - f) * r[..., j] + f * r[..., j + 1]
+    x = bell_length(ER, percent_bell)[..., None] * s
+    return x * r_t[..., None], r * r_t[..., None]
+
+
+if __name__ == "__main__":
+    # Compare with the 80% Rao table used by BasicSizing
+    eratio     = [4,    5,    10,   20,   30,   40,   50,   100]
+    theta_n_80 = [21.5, 23.0, 26.3, 28.8, 30.0, 31.0, 31.5, 33.5]
+    theta_e_80 = [14.0, 13.0, 11.0, 9.0,  8.5,  8.0,  7.5,  7.0]
+
+    gamma = 1.22
+    theta_n, theta_e, eta_div = moc_angles(gamma, eratio, 0.8)
+    print(f"80% bell, gamma = {gamma}")
+    print("   ER   Rao theta_n  MOC theta_n   Rao theta_e  MOC theta_e   eta_div")
+    for i, ER in enumerate(eratio):
+        print(f"{ER:5.0f} {theta_n_80[i]:12.1f} {theta_n[i]:12.1f} {theta_e_80[i]:13.1f} {theta_e[i]:12.1f} {eta_div[i]:9.4f}")
+
+    # Truncated Rao walls for a batch of designs inside the family, r_t = 1 cm
+    ER = np.array([3, 4, 5, 6])
+    x, r = truncated_contour(gamma, ER, 0.8, 0.01)
+    print(f"\nWalls for ER {ER}: length {x[:, -1] * 1000} mm, exit radius {r[:, -1] * 1000} mm")
@@ -9,6 +9,8 @@ import numpy as np
 import pandas as pd
 import CoolProp.CoolProp as CP
 import matplotlib.pyplot as plt
+from InjectorSizing import injector_sweep
+from PlotCache import load_or_compute, select, plot_sweep
 
 mode = "Hotfire"
 
@@ -62,10 +64,6 @@ elif mode == "Water":  # Water test
 ox_inlet_pressure = chamber_pressure + ox_pressure_drop
 fuel_inlet_pressure = chamber_pressure + fuel_pressure_drop
 
-# Fluid Properties
-ox_density = CP.PropsSI('D', 'T', ox_temp, 'P', ox_inlet_pressure, 'NitrousOxide')               #[kg/m^3] density of LOX
-fuel_density = CP.PropsSI('D', 'T', fuel_temp, 'P', fuel_inlet_pressure, 'Ethanol')          #[kg/m^3] density of FUEL
-
 # Pintle Geometry
 shaft_diameter = chamber_diameter * shaft_ratio  #in
 shaft_radius = shaft_diameter / 2                #in
@@ -79,62 +77,51 @@ fuel_flow_rate = fuel_flow_total * (1 - fc_fuel_ratio)
 
 # Load Drill Bit Sizes
 drill_bits_df = pd.read_csv(r"Drill_Bits.csv")
-drill_bits = np.sort(pd.to_numeric(drill_bits_df["Decimal Value (mm)"], errors='coerce').dropna() * 0.001) # Convert mm to m
-
-results = []
-
-# Main Optimization Loop
-for num_holes in range(10, 100, 2): #increment by 2
+drill_bits = np.sort(pd.to_numeric(drill_bits_df["Decimal Value (mm)"], errors='coerce').dropna().to_numpy() * 0.001) # Convert mm to m
+
+# Main Optimization Sweep (same math as InjectorSizing, cached so re-plots skip CoolProp and the sweep)
+def psp_sweep(ox_temp, fuel_temp, ox_inlet_pressure, fuel_inlet_pressure, **sweep_inputs):
+    # Fluid Properties
+    ox_density = CP.PropsSI('D', 'T', ox_temp, 'P', ox_inlet_pressure, 'NitrousOxide')               #[kg/m^3] density of LOX
+    fuel_density = CP.PropsSI('D', 'T', fuel_temp, 'P', fuel_inlet_pressure, 'Ethanol')          #[kg/m^3] density of FUEL
+
+    sweep = injector_sweep(ox_rho=ox_density, fuel_rho=fuel_density, **sweep_inputs)
+    return {
+        'num_holes': sweep['num_holes'],
+        'hole_diameter_in': sweep['hole_diam_in'],
+        'hole_diameter_mm': sweep['hole_dia_mm'],
+        'annular_thickness': sweep['annular_thk'],
+        'LMR': sweep['LMR'],
+        'TMR': sweep['TMR'],
+        'blockage_factor': sweep['blockage_factor'],
+        'spray_angle_degrees': sweep['spray_angle_deg'],
+        'vel_OX': sweep['vel_ox'],
+        'vel_FUEL': sweep['vel_fuel'],
+        'area_OX_in': sweep['area_ox_in'],
+        'area_FUEL_in': sweep['area_fuel_in'],
+    }
+
+sweep_inputs = dict(ox_temp=ox_temp, fuel_temp=fuel_temp, ox_inlet_pressure=ox_inlet_pressure,
+                    fuel_inlet_pressure=fuel_inlet_pressure, m_dot_ox=ox_flow_rate, m_dot_fuel_pint=fuel_flow_rate,
+                    OF=OF_ratio, delta_P_ox=ox_pressure_drop, shaft_dia=shaft_diameter, drills=drill_bits,
+                    discharge_coef=discharge_coef, hole_counts=list(range(10, 100, 2))) #increment by 2
+candidates = load_or_compute("psp_injector_sweep", sweep_inputs, psp_sweep, depends=(injector_sweep,))
+
+# Only keep configurations within target LMR range
+in_window = ((target_TMR_min <= candidates['TMR']) & (candidates['TMR'] <= target_TMR_max)
+             & (target_LMR_min <= candidates['LMR']) & (candidates['LMR'] <= target_LMR_max))
+results = select(candidates, in_window)
 
-    # Calculate theoretical hole diameter
-    area_OX = ox_flow_rate / (discharge_coef * np.sqrt(2 * ox_density * ox_pressure_drop)) # Standard Orifice Equation
-    hole_diameter = 2 * np.sqrt(area_OX / (np.pi * num_holes))                             # Diameter derived from area of a circle times the number of holes
-
-    # Snap to nearest drill bit size
-    idx = np.argmin(np.abs(hole_diameter - drill_bits))
-    real_diam_OX = drill_bits[idx]
-    real_area_OX = num_holes * np.pi * (real_diam_OX / 2)**2
-    
-    
-    # Calculate velocities
-    vel_OX = ox_flow_rate / (real_area_OX * ox_density) # continuity equation
-    
-    annular_thk = (np.pi * ox_density * real_diam_OX) / (4 * fuel_density * OF_ratio**2) # NASA SP-8089 Annular Thickness Calculation
-    area_FUEL = np.pi * ((shaft_radius + annular_thk)**2 - shaft_radius**2)
-    vel_FUEL = fuel_flow_rate / (area_FUEL * fuel_density)
-    
-    # Momentum Ratios
-    TMR = (ox_flow_rate * vel_OX) / (fuel_flow_rate * vel_FUEL)
-    blockage_factor = (num_holes * real_diam_OX) / (np.pi * shaft_diameter)
-    LMR = TMR / blockage_factor
-    
-    # Only store configurations within target LMR range
-    if (target_TMR_min <= TMR <= target_TMR_max) and (target_LMR_min <= LMR <= target_LMR_max):
-        spray_angle = np.degrees(2 * 0.7 * np.arctan(2 * LMR))  # From Flow characteristics of a pintle injector element Eq(3)
-        
-        results.append({
-            'num_holes': num_holes,
-            'hole_diameter_in': real_diam_OX / in_to_m,  # Convert back to inches
-            'hole_diameter_mm': real_diam_OX * 1000,     # Diameter in mm (convert m to mm)
-            'annular_thickness': annular_thk / in_to_m,
-            'LMR': LMR,
-            'TMR': TMR,
-            'blockage_factor': blockage_factor,
-            'spray_angle_degrees': spray_angle,
-            'vel_OX': vel_OX,
-            'vel_FUEL': vel_FUEL,
-            'area_OX_in': real_area_OX/ in_to_m**2,  # Convert area to inches^2
-            'area_FUEL_in': area_FUEL/ in_to_m**2,  # Convert area to inches^2
-        })
 # Output Results
-if results:
+if len(results['num_holes']):
     target_TMR_mid = (target_TMR_min + target_TMR_max) / 2
-    results.sort(key=lambda x: abs(x['LMR'] - target_TMR_mid))
-    
+    order = np.argsort(np.abs(results['LMR'] - target_TMR_mid), kind='stable')
+    results = select(results, order)
+
     # Create DataFrame and save to Excel
     results_df = pd.DataFrame(results)
     #results_df.to_excel('optimized_injector_configs.xlsx', index=False)
-    print(f"Found {len(results)} valid configurations. Top 3:")
+    print(f"Found {len(results_df)} valid configurations. Top 3:")
     top3 = results_df.head(3).round(6).reset_index(drop=True)
     top3.index += 1
     print(top3)
@@ -143,21 +130,21 @@ else:
 
 # Plot Relationship between Number of Holes and LMR
 plot = 1 # Set to 1 to enable plotting
-if results and len(results) > 1 and plot:
+if len(results['num_holes']) > 1 and plot:
     # Create figure with two subplots
     plt.figure(figsize=(12, 5))
     
     # TMR vs Hole Count
-    plt.subplot(1, 2, 1)
-    plt.plot(results_df['num_holes'], results_df['TMR'], 'bo-')
+    ax = plt.subplot(1, 2, 1)
+    plot_sweep(ax, results, 'num_holes', 'TMR', fmt='bo-')
     plt.xlabel('Number of Holes')
     plt.ylabel('TMR')
     plt.title('TMR vs Hole Count')
     plt.grid(True)
     
     # LMR vs Hole Count
-    plt.subplot(1, 2, 2)
-    plt.plot(results_df['num_holes'], results_df['LMR'], 'ro-')
+    ax = plt.subplot(1, 2, 2)
+    plot_sweep(ax, results, 'num_holes', 'LMR', fmt='ro-')
     plt.xlabel('Number of Holes')
     plt.ylabel('LMR')
     plt.title('LMR vs Hole Count')
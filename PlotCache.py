@@ -0,0 +1,170 @@
+# This code provides a small cache + plot layer so the sizing scripts only run CEA, CoolProp and the sizing
+# loops when their inputs actually change. Re-plotting with different axes, filters or styling reads the
+# stored sweep results straight from disk.
+
+# Cache layout:
+# Every sweep is stored as a single .npz file in CACHE_DIR, named "<sweep name>_<input hash>.npz".
+# The hash is taken over the sweep inputs (scalars, strings, lists and numpy arrays) plus a hash of the source files
+# of the compute function and the modules it depends on (passed as depends), and an optional version tag. Changing
+# any input or editing that code gives a new file, so old results are never reused by accident. Each file holds one
+# array per result column. CACHE_DIR sits next to the scripts, so every working directory shares one cache.
+
+# Level of detail:
+# Large result sets (millions of injector candidates) are decimated before plotting. Each column is split into
+# max_points/2 buckets and only the min and max of every bucket are kept, so peaks and outliers survive while
+# matplotlib only ever draws a few thousand points. The bucket min/max are one reduceat pass (O(n), no sort), and
+# the x sort order of every plotted column is computed once and reused by later redraws and masks.
+
+# Useful links:
+# https://numpy.org/doc/stable/reference/generated/numpy.savez.html
+# https://matplotlib.org/stable/users/explain/figure/backends.html (Agg backend for headless rendering)
+
+# Imports:
+import os
+import json
+import inspect
+import hashlib
+import weakref
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sweep_cache")   # Next to the scripts, not the cwd
+MAX_PLOT_POINTS = 4000
+
+
+# CACHE
+
+# Hash of a set of sweep inputs. Arrays are hashed by dtype, shape and raw bytes; everything else by its json form
+def input_hash(inputs):
+    h = hashlib.sha256()
+    for key in sorted(inputs):
+        value = inputs[key]
+        h.update(key.encode())
+        if isinstance(value, np.ndarray):
+            h.update(str(value.dtype).encode())
+            h.update(str(value.shape).encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+        else:
+            h.update(json.dumps(value, sort_keys=True, default=float).encode())
+    return h.hexdigest()[:16]
+
+
+def cache_path(name, inputs, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{name}_{input_hash(inputs)}.npz")
+
+
+# Hash of the source files the given functions or modules are defined in (objects without one, e.g. builtins, are
+# skipped)
+def source_hash(*objects):
+    h = hashlib.sha256()
+    for obj in objects:
+        try:
+            with open(inspect.getsourcefile(obj), "rb") as f:
+                h.update(f.read())
+        except (TypeError, OSError):
+            continue
+    return h.hexdigest()[:16]
+
+
+# Returns the stored columns for (name, inputs) or runs compute(**inputs) and stores its result.
+# compute must return a dict of equal-length arrays (one per column). The key also covers the source file of
+# compute and of every function or module in depends (the other sizing code compute calls into), plus version for
+# anything a source hash can't see (data files, installed packages).
+def load_or_compute(name, inputs, compute, cache_dir=CACHE_DIR, refresh=False, version=None, depends=()):
+    path = cache_path(name, dict(inputs, _source=source_hash(compute, *depends), _version=version), cache_dir)
+    if os.path.exists(path) and not refresh:
+        with np.load(path) as stored:
+            return {key: stored[key] for key in stored.files}
+
+    data = {key: np.asarray(value) for key, value in compute(**inputs).items()}
+
+    # Write to a temp file first so a crash never leaves a half written cache entry behind
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **data)
+    os.replace(tmp_path, path)
+    return data
+
+
+# Applies a boolean mask to every column of a cached result
+def select(data, mask):
+    return {key: value[mask] for key, value in data.items()}
+
+
+# LEVEL OF DETAIL
+
+# Min/max bucket decimation. Returns the indices to keep (sorted), so any column can be indexed with them.
+def decimate(y, max_points=MAX_PLOT_POINTS):
+    y = np.asarray(y)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+
+    n_buckets = max(max_points // 2, 1)
+    starts = np.linspace(0, n, n_buckets + 1).astype(int)[:-1]
+    bucket = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+
+    # First position in every bucket that holds the bucket's min/max (nan ignored)
+    def first_match(extreme):
+        hits = np.flatnonzero(y == extreme[bucket])
+        return hits[np.r_[True, bucket[hits[1:]] != bucket[hits[:-1]]]] if len(hits) else hits
+
+    with np.errstate(invalid="ignore"):
+        idx_min = first_match(np.fmin.reduceat(y, starts))
+        idx_max = first_match(np.fmax.reduceat(y, starts))
+    return np.unique(np.concatenate([idx_min, idx_max]))
+
+
+# PLOTTING
+
+# Stable sort order of a column, computed once per array (columns are treated as read only once cached)
+_sort_orders = {}
+
+
+def sort_order(values):
+    key = id(values)
+    if key not in _sort_orders:
+        _sort_orders[key] = np.argsort(values, kind="stable")
+        weakref.finalize(values, _sort_orders.pop, key, None)
+    return _sort_orders[key]
+
+
+# Plots column y against column x from a cached result. mask filters rows, max_points sets the level of detail.
+def plot_sweep(ax, data, x, y, mask=None, max_points=MAX_PLOT_POINTS, fmt="-", **style):
+    x_vals = data[x]
+    y_vals = data[y]
+    keep = np.arange(len(x_vals)) if mask is None else np.flatnonzero(mask)
+    if len(keep) > max_points:
+        order = sort_order(x_vals)
+        if mask is not None:
+            order = order[np.asarray(mask)[order]]
+        keep = order[decimate(y_vals[order], max_points)]
+
+    ax.plot(x_vals[keep], y_vals[keep], fmt, **style)
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    return ax
+
+
+# HEADLESS BATCH RENDERING
+
+# Runs one plot job with the Agg backend and saves it. plot_fn(fig, data, **kwargs) draws onto the figure.
+# plot_fn must be a module level function so it can be sent to a worker process.
+def render_to_file(plot_fn, data, path, figsize=(10, 5), dpi=150, kwargs=None):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=figsize)
+    plot_fn(fig, data, **(kwargs or {}))
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return path
+
+
+# Renders a list of jobs in parallel. Each job is a dict of render_to_file arguments.
+def render_batch(jobs, max_workers=None):
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(render_to_file, **job) for job in jobs]
+        return [f.result() for f in futures]
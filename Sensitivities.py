@@ -0,0 +1,284 @@
+# This code provides exact first derivatives of the BasicSizing, injector and TankSizing outputs with respect to
+# their inputs, batched over designs, so optimizers and sensitivity reports don't need 2N finite difference runs.
+
+# Method - forward mode automatic differentiation:
+# Every quantity is carried as a Dual (value, gradient) where value has shape (n_designs,) and gradient has shape
+# (n_designs, n_inputs). The sizing equations below are the same as BasicSizing, InjectorSizing.injector_sweep and
+# TankSizing, written once in terms of Duals, so one pass gives every output and its full Jacobian.
+
+# Things that are not differentiable:
+# - The snapped drill diameter and the hole count are piecewise constant, so they are held fixed at the chosen
+#   configuration (TMR, LMR, annular thickness are derivatives at that drill/hole count). hole_dia_ideal is the
+#   continuous orifice diameter before snapping.
+# - Oxidizer density comes from CoolProp; its pressure derivative d(rho)/dP|T is taken from CoolProp as well, so
+#   Pc, dP_fraction and p_tank carry through the densities.
+# - Waterflow uses InjectorSizing's 40 psi floor on the injector drop; where it is active the drop does not move with
+#   Pc or dP_fraction.
+
+# Imports:
+import numpy as np
+from dataclasses import dataclass
+
+# Conversion Factors
+lbf_to_N = 4.44822162
+psi_to_pa = 6894.76
+in_to_m = 0.0254
+
+# Default inputs, same values as BasicSizing, InjectorSizing and TankSizing
+DEFAULTS = {
+    # BasicSizing
+    "thrust": 400 * lbf_to_N,
+    "Pc": 300 * psi_to_pa,
+    "OF": 3.0,
+    "L_star": 60 * in_to_m,
+    "eta_cstar": 0.85,
+    "eta_cf": 0.95,
+    "c": 1649.9,
+    "c_star": 1154.1,
+    "ER": 3.9821,
+    "percent_bell": 0.8,
+    "d_c": 3.25 * in_to_m,
+    # Injector
+    "discharge_coef": 0.65,
+    "shaft_ratio": 1/5,
+    "film_fraction": 0.05,
+    "dP_fraction": 0.2,
+    # TankSizing
+    "burn_time": 4.0,
+    "id_tank": 3.75 * in_to_m,
+    "od_tank": 4 * in_to_m,
+    "p_tank": 776 * psi_to_pa,
+    "num_fastener": 8.0,
+    "id_fastener": 0.2614 * in_to_m,
+    "od_fastener": 0.3125 * in_to_m,
+    "edge_dist": 0.5 * in_to_m,
+    "ullage_ox": 1.15,
+    "ullage_fuel": 1.10,
+}
+
+OUTPUTS = ["m_dot_total", "m_dot_fuel", "m_dot_ox", "d_t", "d_e", "L_c", "L_n", "CR",
+           "hole_dia_ideal", "annular_thk", "TMR", "LMR", "blockage_factor",
+           "len_ox", "len_fuel", "hoop_fos", "axial_fos", "bolt_fos", "tear_out_fos", "tensile_fos", "bearing_fos"]
+
+
+class Dual:
+    __array_ufunc__ = None     # so numpy arrays on the left defer to Dual's operators
+
+    def __init__(self, val, grad):
+        self.val = val
+        self.grad = grad
+
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.val + other.val, self.grad + other.grad)
+        return Dual(self.val + other, self.grad)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return Dual(-self.val, -self.grad)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.val * other.val, self.grad * other.val[:, None] + other.grad * self.val[:, None])
+        other = np.asarray(other)
+        return Dual(self.val * other, self.grad * (other[..., None] if other.ndim else other))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            return self * other**-1
+        return self * (1 / np.asarray(other))
+
+    def __rtruediv__(self, other):
+        return self**-1 * other
+
+    def __pow__(self, exponent):
+        return Dual(self.val**exponent, self.grad * (exponent * self.val**(exponent - 1))[:, None])
+
+
+def sqrt(x):
+    return x**0.5
+
+
+@dataclass
+class Sensitivity:
+    inputs: list              # Input names (Jacobian columns)
+    outputs: list             # Output names (Jacobian rows)
+    values: np.ndarray        # Output values, (n_designs, n_outputs)
+    jacobian: np.ndarray      # d(output)/d(input), (n_designs, n_outputs, n_inputs)
+    input_values: np.ndarray  # Input values, (n_designs, n_inputs)
+
+    def d(self, output, wrt):
+        return self.jacobian[:, self.outputs.index(output), self.inputs.index(wrt)]
+
+    # Normalized sensitivities d(ln out)/d(ln in): % change of the output per % change of the input
+    def elasticity(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.jacobian * self.input_values[:, None, :] / self.values[:, :, None]
+
+
+# Oxidizer density and its pressure derivative [kg/m^3], [kg/m^3/Pa]
+def _ox_density(mode, ox_temp, pressure):
+    if mode != "Hotfire":
+        return np.full(len(pressure), 1000.0), np.zeros(len(pressure))
+    import CoolProp.CoolProp as CP
+    rho = np.array([CP.PropsSI("D", "T", ox_temp, "P", p, "NitrousOxide") for p in pressure])
+    drho_dp = np.array([CP.PropsSI("d(D)/d(P)|T", "T", ox_temp, "P", p, "NitrousOxide") for p in pressure])
+    return rho, drho_dp
+
+
+# Nearest-drill configuration for each design at its nominal inputs (same search and ranking as InjectorSizing)
+def _nominal_injector(values, mode, ox_rho_inj, fuel_rho):
+    from InjectorSizing import injector_sweep, injector_drop, load_drills
+    from InjectorRanking import CandidateIndex
+
+    drills = load_drills()
+    num_holes = np.empty(len(ox_rho_inj))
+    hole_dia = np.empty(len(ox_rho_inj))
+    windows = {"TMR": (0.9, 1.5), "LMR": (1.0, 3.0)}
+    for i in range(len(ox_rho_inj)):
+        c_act = values["c"][i] * values["eta_cstar"][i] * values["eta_cf"][i]
+        m_dot = values["thrust"][i] / c_act
+        OF = values["OF"][i]
+        delta_P_ox = injector_drop(mode, values["Pc"][i], values["dP_fraction"][i])
+        candidates = injector_sweep(m_dot * OF / (1 + OF), m_dot / (1 + OF) * (1 - values["film_fraction"][i]), OF,
+                                    ox_rho_inj[i], fuel_rho, delta_P_ox,
+                                    values["d_c"][i] * values["shaft_ratio"][i], drills, values["discharge_coef"][i])
+        index = CandidateIndex(candidates)
+        best = index.rank(1, windows)
+        row = best[0] if len(best) else index.rank(1)[0]      # nothing in the windows, closest LMR overall
+        num_holes[i] = candidates["num_holes"][row]
+        hole_dia[i] = candidates["hole_dia_mm"][row] / 1000
+    return num_holes, hole_dia
+
+
+# Variable Definitions:
+# mode = "Hotfire" or "Waterflow"
+# inputs = any DEFAULTS key as a scalar or (n_designs,) array, missing keys use DEFAULTS
+# ox_temp_inj, ox_temp_tank = N2O temperature at the injector / in the tank [K] (InjectorSizing / TankSizing)
+# num_holes, hole_dia = injector configuration to differentiate at; None picks the best ranked configuration
+#
+# Returns a Sensitivity with every OUTPUTS value and its Jacobian with respect to every DEFAULTS input
+
+def jacobian(mode="Hotfire", ox_temp_inj=253, ox_temp_tank=295, fuel_rho=789, num_holes=None, hole_dia=None,
+             **inputs):
+    if mode == "Waterflow":     # Same mode defaults as BasicSizing
+        fuel_rho = 1000
+        inputs.setdefault("OF", 1.0)
+        inputs.setdefault("Pc", 14.7 * psi_to_pa)
+        inputs.setdefault("dP_fraction", 0.8)               # Same drop rule as InjectorSizing.injector_drop
+    names = list(DEFAULTS)
+    n = max([np.size(value) for value in inputs.values()] + [1])
+    values = {name: np.broadcast_to(np.asarray(inputs.get(name, DEFAULTS[name]), dtype=float), (n,)).copy()
+              for name in names}
+    eye = np.eye(len(names))
+    x = {name: Dual(values[name], np.broadcast_to(eye[i], (n, len(names))).copy()) for i, name in enumerate(names)}
+
+    # BASICSIZING
+    c_actual = x["c"] * x["eta_cstar"] * x["eta_cf"]
+    c_star_actual = x["c_star"] * x["eta_cstar"]
+    m_dot_total = x["thrust"] / c_actual
+    m_dot_fuel = m_dot_total / (1 + x["OF"])
+    m_dot_ox = m_dot_fuel * x["OF"]
+
+    A_t = c_star_actual * m_dot_total / x["Pc"]
+    d_t = 2 * sqrt(A_t / np.pi)
+    A_e = A_t * x["ER"]
+    d_e = 2 * sqrt(A_e / np.pi)
+    L_n = x["percent_bell"] * (sqrt(x["ER"]) - 1) * (d_t / 2) / np.tan(np.deg2rad(15))
+
+    A_c = np.pi * (x["d_c"] / 2)**2
+    CR = A_c / A_t
+    V_c = x["L_star"] * A_t
+    L_c = V_c / A_c
+
+    # INJECTOR
+    delta_P_ox = x["Pc"] * x["dP_fraction"]
+    if mode == "Waterflow":     # 40 psi floor, the drop is constant where the floor is active
+        floor = delta_P_ox.val < 40 * psi_to_pa
+        delta_P_ox = Dual(np.where(floor, 40 * psi_to_pa, delta_P_ox.val),
+                          np.where(floor[:, None], 0.0, delta_P_ox.grad))
+    inlet_P_ox = x["Pc"] + delta_P_ox
+    rho, drho_dp = _ox_density(mode, ox_temp_inj, inlet_P_ox.val)
+    ox_rho = Dual(rho, inlet_P_ox.grad * drho_dp[:, None])
+
+    if num_holes is None or hole_dia is None:
+        num_holes, hole_dia = _nominal_injector(values, mode, rho, fuel_rho)
+    num_holes = np.broadcast_to(np.asarray(num_holes, dtype=float), (n,))
+    act_dia_ox = np.broadcast_to(np.asarray(hole_dia, dtype=float), (n,))
+
+    m_dot_fuel_pint = m_dot_fuel * (1 - x["film_fraction"])
+    shaft_dia = x["d_c"] * x["shaft_ratio"]
+    shaft_rad = shaft_dia / 2
+
+    area_ox = m_dot_ox / (x["discharge_coef"] * sqrt(2 * ox_rho * delta_P_ox))
+    hole_dia_ideal = 2 * sqrt(area_ox / (np.pi * num_holes))
+
+    act_A_ox = num_holes * np.pi * (act_dia_ox / 2)**2
+    vel_ox = m_dot_ox / (act_A_ox * ox_rho)
+    annular_thk = (np.pi * ox_rho * act_dia_ox) / (4 * fuel_rho * (x["OF"]**2))
+    A_fuel = np.pi * ((shaft_rad + annular_thk)**2 - shaft_rad**2)
+    vel_fuel = m_dot_fuel_pint / (A_fuel * fuel_rho)
+    TMR = (m_dot_ox * vel_ox) / (m_dot_fuel_pint * vel_fuel)
+    BF = (num_holes * act_dia_ox) / (np.pi * shaft_dia)
+    LMR = TMR / BF
+
+    # TANKSIZING
+    from TankSizing import yield_tensile_6061, yield_bea_6061, shear_6061, shear_steel
+
+    rho_tank, drho_tank_dp = _ox_density(mode, ox_temp_tank, values["p_tank"])
+    ox_rho_tank = Dual(rho_tank, x["p_tank"].grad * drho_tank_dp[:, None])
+
+    t_tank = (x["od_tank"] - x["id_tank"]) / 2
+    mass_total_req = m_dot_total * x["burn_time"]
+    mass_fuel = mass_total_req / (x["OF"] + 1)
+    mass_ox = mass_total_req - mass_fuel
+    tank_area_m2 = np.pi * (x["id_tank"] / 2)**2
+    len_ox = mass_ox / ox_rho_tank * x["ullage_ox"] / tank_area_m2
+    len_fuel = mass_fuel / fuel_rho * x["ullage_fuel"] / tank_area_m2
+
+    F_bolt = (np.pi/4) * (x["id_tank"]**2) * x["p_tank"] / x["num_fastener"]
+    bolt_fos = shear_steel / (F_bolt / ((np.pi/4) * (x["id_fastener"]**2)))
+    hoop_fos = yield_tensile_6061 / (x["p_tank"] * x["od_tank"] / (2*t_tank))
+    axial_fos = yield_tensile_6061 / (x["p_tank"] * x["od_tank"] / (4*t_tank))
+    min_dist = x["edge_dist"] - x["od_fastener"] / 2
+    tear_out_fos = shear_6061 / (F_bolt / (min_dist * 2 * t_tank))
+    tensile_stress = ((np.pi/4) * (x["id_tank"]**2) * x["p_tank"]
+                      / ((np.pi * (x["od_tank"] - t_tank) - x["num_fastener"] * x["od_fastener"]) * t_tank))
+    tensile_fos = yield_tensile_6061 / tensile_stress
+    bearing_fos = yield_bea_6061 / (F_bolt / (x["od_fastener"] * t_tank))
+
+    results = {"m_dot_total": m_dot_total, "m_dot_fuel": m_dot_fuel, "m_dot_ox": m_dot_ox, "d_t": d_t, "d_e": d_e,
+               "L_c": L_c, "L_n": L_n, "CR": CR, "hole_dia_ideal": hole_dia_ideal, "annular_thk": annular_thk,
+               "TMR": TMR, "LMR": LMR, "blockage_factor": BF, "len_ox": len_ox, "len_fuel": len_fuel,
+               "hoop_fos": hoop_fos, "axial_fos": axial_fos, "bolt_fos": bolt_fos, "tear_out_fos": tear_out_fos,
+               "tensile_fos": tensile_fos, "bearing_fos": bearing_fos}
+
+    return Sensitivity(inputs=names, outputs=list(OUTPUTS),
+                       values=np.stack([results[name].val for name in OUTPUTS], axis=1),
+                       jacobian=np.stack([results[name].grad for name in OUTPUTS], axis=1),
+                       input_values=np.stack([values[name] for name in names], axis=1))
+
+
+# Prints the largest normalized sensitivities of every output for one design
+def sensitivity_report(sens, design=0, top=4):
+    elasticity = sens.elasticity()[design]
+    for i, output in enumerate(sens.outputs):
+        order = np.argsort(-np.abs(np.nan_to_num(elasticity[i])))[:top]
+        terms = ", ".join(f"{sens.inputs[j]} {elasticity[i, j]:+.3f}" for j in order if elasticity[i, j])
+        print(f"{output:>16} = {sens.values[design, i]:12.6g}   {terms}")
+
+
+if __name__ == "__main__":
+    mode = "Hotfire"
+    sens = jacobian(mode)
+    print("Output = value   largest d(ln output)/d(ln input)")
+    sensitivity_report(sens)
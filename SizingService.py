@@ -0,0 +1,272 @@
+# This code provides a local sizing service so the dashboard, the test stand planner and scripted studies can share
+# one warm process instead of each importing and rerunning BasicSizing, the injector scripts and TankSizing.
+
+# Protocol:
+# Newline delimited JSON over TCP (serve) or a Unix socket (serve_unix). One request per line:
+#   {"id": 1, "kind": "sizing", "mode": "Hotfire", "params": {"Pc": 2068428, "OF": 3.2}}
+# and one response per line, in completion order:
+#   {"id": 1, "ok": true, "result": {...}, "latency_ms": 3.1, "batch_size": 12}
+# kind is one of KERNELS ("sizing", "injector", "tank", "feed", "cea") or "stats".
+
+# Micro-batching:
+# Requests are queued per (kind, mode, parameter names). Every window_ms the batcher drains each queue, builds
+# one column per parameter and makes a single call into the SweepExecutor kernel for that kind, then hands each
+# caller its row. The kernel call runs in a worker thread so the event loop keeps accepting requests meanwhile.
+# If the kernel raises, the batch is rerun one row at a time so only the offending request gets the error.
+# Drill catalog, CoolProp densities and the CEA object are cached in-process (lru_cache), so they stay warm.
+
+# Imports:
+import json
+import time
+import asyncio
+import numpy as np
+from collections import defaultdict, deque
+from SweepExecutor import sizing_kernel, feed_kernel, tank_kernel, injector_kernel
+
+
+# CEA isp/Tc/eps for every row, Pc in psia, expanded to 14.7 psia like OFSelection
+def cea_kernel(mode="Hotfire", Pc=(), OF=()):
+    from OFSelection import e98_cea
+
+    cea = e98_cea()
+    eps = np.array([cea.get_eps_at_PcOvPe(Pc=p, MR=mr, PcOvPe=p / 14.7) for p, mr in zip(Pc, OF)])
+    isp = np.array([cea.get_Isp(Pc=p, MR=mr, eps=e, frozen=0) for p, mr, e in zip(Pc, OF, eps)])
+    tc = np.array([cea.get_Tcomb(Pc=p, MR=mr) for p, mr in zip(Pc, OF)])
+    return {"eps": eps, "isp": isp, "tc": tc}
+
+
+# Loads the drill catalog, CoolProp and (if rocketcea is installed) the CEA object before the first request
+def warm_up(mode="Hotfire"):
+    for kind in ("sizing", "tank", "injector"):
+        KERNELS[kind](mode=mode)
+    try:
+        from OFSelection import e98_cea
+        e98_cea()
+    except ImportError:
+        pass
+
+
+KERNELS = {
+    "sizing": sizing_kernel,
+    "injector": injector_kernel,
+    "tank": tank_kernel,
+    "feed": lambda mode="Hotfire", **inputs: feed_kernel(**inputs),
+    "cea": cea_kernel,
+}
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class MicroBatcher:
+    def __init__(self, window_ms=5.0, max_batch=4096, kernels=KERNELS, history=100000):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.kernels = kernels
+        self.queues = defaultdict(list)
+        self.requests = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=history)      # Latest requests only, so a long running service stays bounded
+        self.batch_sizes = deque(maxlen=history)
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # Queues one request and waits for its row of the batched result
+    async def submit(self, kind, params, mode="Hotfire"):
+        if kind not in self.kernels:
+            raise ValueError(f"unknown kind {kind!r}, expected one of {sorted(self.kernels)}")
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        key = (kind, mode, tuple(sorted(params)))
+        self.queues[key].append((params, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.window)
+            for key in list(self.queues):
+                pending = self.queues[key][:self.max_batch]
+                del self.queues[key][:self.max_batch]
+                if not self.queues[key]:
+                    del self.queues[key]
+                if not pending:
+                    continue
+                # Never let one batch take the loop down, or every later request would wait forever
+                try:
+                    await self._run_batch(key, pending)
+                except Exception as error:
+                    for _, future, _ in pending:
+                        if not future.done():
+                            future.set_exception(error)
+
+    async def _run_batch(self, key, pending):
+        kind, mode, names = key
+        try:
+            # Columns are built here too: a malformed parameter (e.g. a list where others send a scalar) fails the
+            # batch like a kernel error does
+            columns = {name: np.array([params[name] for params, _, _ in pending]) for name in names}
+            outputs = await asyncio.to_thread(self.kernels[kind], mode=mode, **columns)
+            # Requests without params all share the single row of defaults
+            results = [{name: _to_json(values[row if names else 0]) for name, values in outputs.items()}
+                       for row in range(len(pending))]
+        except Exception as error:
+            # One bad row fails the whole batch, rerun the rows one at a time so only its caller gets the error
+            if len(pending) > 1:
+                for one in pending:
+                    await self._run_batch(key, [one])
+                return
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        done = time.perf_counter()
+        self.batches += 1
+        self.batch_sizes.append(len(pending))
+        for result, (_, future, queued) in zip(results, pending):
+            latency = (done - queued) * 1000
+            self.requests += 1
+            self.latencies.append(latency)
+            if not future.done():
+                future.set_result((result, latency, len(pending)))
+
+    def stats(self):
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+            "max_batch_size": int(max(self.batch_sizes, default=0)),
+            "latency_ms_p50": float(np.percentile(latencies, 50)),
+            "latency_ms_p99": float(np.percentile(latencies, 99)),
+        }
+
+
+# SERVER
+
+async def handle_request(batcher, request):
+    if request.get("kind") == "stats":
+        return {"id": request.get("id"), "ok": True, "result": batcher.stats()}
+    try:
+        result, latency, batch_size = await batcher.submit(request["kind"], request.get("params", {}),
+                                                           request.get("mode", "Hotfire"))
+        return {"id": request.get("id"), "ok": True, "result": result, "latency_ms": latency, "batch_size": batch_size}
+    except Exception as error:
+        return {"id": request.get("id"), "ok": False, "error": f"{type(error).__name__}: {error}"}
+
+
+def _connection_handler(batcher):
+    async def handle(reader, writer):
+        lock = asyncio.Lock()
+
+        async def answer(line):
+            try:
+                response = await handle_request(batcher, json.loads(line))
+            except json.JSONDecodeError as error:
+                response = {"id": None, "ok": False, "error": f"JSONDecodeError: {error}"}
+            async with lock:
+                writer.write(json.dumps(response, default=_to_json).encode() + b"\n")
+                await writer.drain()
+
+        # Each line is answered concurrently so one connection can fill a whole batch
+        tasks = set()
+        while line := await reader.readline():
+            if line.strip():
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        writer.close()
+    return handle
+
+
+async def serve(host="127.0.0.1", port=8765, window_ms=5.0):
+    batcher = MicroBatcher(window_ms)
+    await asyncio.to_thread(warm_up)
+    server = await asyncio.start_server(_connection_handler(batcher), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+async def serve_unix(path="/tmp/rocket_sizing.sock", window_ms=5.0):
+    batcher = MicroBatcher(window_ms)
+    await asyncio.to_thread(warm_up)
+    server = await asyncio.start_unix_server(_connection_handler(batcher), path)
+    async with server:
+        await server.serve_forever()
+
+
+# CLIENTS
+
+# Socket client for a running service, requests on one connection are pipelined
+class SizingClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._next_id = 0
+        self._waiting = {}
+        self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765):
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path="/tmp/rocket_sizing.sock"):
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def _listen(self):
+        while line := await self.reader.readline():
+            response = json.loads(line)
+            future = self._waiting.pop(response["id"], None)
+            if future is not None and not future.done():
+                future.set_result(response)
+
+    async def request(self, kind, params=None, mode="Hotfire"):
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[self._next_id] = future
+        message = {"id": self._next_id, "kind": kind, "mode": mode, "params": params or {}}
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self._listener.cancel()
+
+
+# Stand-in client that talks to a MicroBatcher in the same process (no sockets), same responses as SizingClient
+class LocalClient:
+    def __init__(self, batcher=None):
+        self.batcher = batcher or MicroBatcher()
+        self._next_id = 0
+
+    async def request(self, kind, params=None, mode="Hotfire"):
+        self._next_id += 1
+        return await handle_request(self.batcher, {"id": self._next_id, "kind": kind, "mode": mode,
+                                                   "params": params or {}})
+
+    async def close(self):
+        await self.batcher.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -0,0 +1,267 @@
+# This code provides a chunked sweep executor for long design studies (OF, Pc, injector and tank parameters).
+# A parameter grid is split into fixed size chunks that run on a local process pool. Every finished chunk is
+# written atomically to its own .npz file and recorded in manifest.json, so a crashed or stopped study picks up
+# where it left off and only reruns the chunks that never finished.
+
+# Out dir layout:
+# manifest.json       - sweep id (hash of kernel name and source file, kernel_kwargs, chunk_size and grid), chunk
+#                       count, finished chunks. Editing the kernel's module changes the id, so resuming into the same
+#                       out_dir raises instead of mixing old and new results
+# chunk_00000.npz     - input and output columns for rows [0, chunk_size)
+# chunk_00001.npz     - ...
+#
+# Kernels take the chunk's input columns as keyword arrays (plus kernel_kwargs) and return a dict of output
+# columns of the same length. The kernels below call BasicSizing, calculate_pressure_drop, injector_sweep and
+# TankSizing row by row, unchanged (chug_kernel and trajectory_kernel finish all of their rows in one vectorized call).
+
+# Imports:
+import os
+import json
+import time
+import dataclasses
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PlotCache import input_hash, source_hash
+from BasicSizing import BasicSizing
+from FeedPressureDrop import calculate_pressure_drop
+
+
+@dataclasses.dataclass
+class SweepProgress:
+    rows_total: int
+    rows_done: int
+    chunks_total: int
+    chunks_done: int
+    elapsed: float           # Wall time of this run [s]
+    throughput: float        # Rows per second over this run
+    eta: float               # Estimated time to finish [s]
+
+
+# Full factorial grid, one flattened column per axis
+def parameter_grid(**axes):
+    names = list(axes)
+    mesh = np.meshgrid(*(np.asarray(axes[name]) for name in names), indexing="ij")
+    return {name: values.ravel() for name, values in zip(names, mesh)}
+
+
+def _write_atomic(path, write):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _write_manifest(path, manifest):
+    _write_atomic(path, lambda f: f.write(json.dumps(manifest, indent=1).encode()))
+
+
+def _run_chunk(kernel, kernel_kwargs, chunk_id, inputs, path):
+    start = time.perf_counter()
+    outputs = kernel(**inputs, **kernel_kwargs)
+    columns = {f"in_{key}": value for key, value in inputs.items()}
+    columns.update({key: np.asarray(value) for key, value in outputs.items()})
+    _write_atomic(path, lambda f: np.savez(f, **columns))
+    return chunk_id, time.perf_counter() - start
+
+
+# Runs kernel over the grid in chunks, skipping chunks already listed in out_dir/manifest.json.
+# max_workers=0 runs the chunks in this process (handy for debugging kernels).
+def run_sweep(kernel, grid, out_dir, chunk_size=1000, max_workers=None, kernel_kwargs=None, progress=print):
+    kernel_kwargs = kernel_kwargs or {}
+    grid = {key: np.asarray(value) for key, value in grid.items()}
+    n_rows = len(next(iter(grid.values())))
+    n_chunks = -(-n_rows // chunk_size)
+
+    sweep_id = input_hash({"kernel": f"{kernel.__module__}.{kernel.__qualname__}", "source": source_hash(kernel),
+                           "kernel_kwargs": kernel_kwargs,
+                           "chunk_size": chunk_size, **{f"grid_{key}": value for key, value in grid.items()}})
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest["sweep_id"] != sweep_id:
+            raise ValueError(f"{out_dir} holds a different sweep ({manifest['sweep_id']}), use a new out_dir")
+    else:
+        manifest = {"sweep_id": sweep_id, "rows": n_rows, "chunk_size": chunk_size, "chunks": n_chunks, "done": {}}
+        _write_manifest(manifest_path, manifest)
+
+    pending = [i for i in range(n_chunks) if str(i) not in manifest["done"]]
+    rows_before = sum(entry["rows"] for entry in manifest["done"].values())
+    rows_run = 0
+    t0 = time.perf_counter()
+
+    def chunk_job(i):
+        start, stop = i * chunk_size, min((i + 1) * chunk_size, n_rows)
+        inputs = {key: value[start:stop] for key, value in grid.items()}
+        return (kernel, kernel_kwargs, i, inputs, os.path.join(out_dir, f"chunk_{i:05d}.npz"))
+
+    def finished(i, seconds):
+        nonlocal rows_run
+        rows = min((i + 1) * chunk_size, n_rows) - i * chunk_size
+        rows_run += rows
+        manifest["done"][str(i)] = {"file": f"chunk_{i:05d}.npz", "rows": rows, "seconds": round(seconds, 3)}
+        _write_manifest(manifest_path, manifest)
+
+        elapsed = time.perf_counter() - t0
+        throughput = rows_run / elapsed if elapsed > 0 else float("inf")
+        rows_done = rows_before + rows_run
+        status = SweepProgress(n_rows, rows_done, n_chunks, len(manifest["done"]), elapsed, throughput,
+                               (n_rows - rows_done) / throughput if throughput else float("inf"))
+        if progress:
+            progress(f"{status.chunks_done}/{n_chunks} chunks, {rows_done}/{n_rows} rows, {throughput:.1f} rows/s, ETA {status.eta:.0f} s")
+        return status
+
+    status = SweepProgress(n_rows, rows_before, n_chunks, len(manifest["done"]), 0.0, 0.0, 0.0)
+    if max_workers == 0:
+        for i in pending:
+            _, seconds = _run_chunk(*chunk_job(i))
+            status = finished(i, seconds)
+    elif pending:
+        # Every chunk that finishes is recorded, even after another one failed. On the first failure the chunks that
+        # have not started are cancelled, the running ones are waited for and recorded, then the failures are raised.
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+        failures = []
+        try:
+            futures = {pool.submit(_run_chunk, *chunk_job(i)): i for i in pending}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                try:
+                    status = finished(*future.result())
+                except Exception as error:
+                    if not failures:
+                        for other in futures:
+                            other.cancel()
+                    failures.append((futures[future], error))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if failures:
+            chunks = ", ".join(str(i) for i, _ in sorted(failures, key=lambda failure: failure[0]))
+            raise RuntimeError(f"{len(failures)} chunk(s) failed ({chunks}), the finished chunks are saved in "
+                               f"{out_dir}; rerun to resume") from failures[0][1]
+    return status
+
+
+# Concatenates every finished chunk in row order
+def load_sweep(out_dir):
+    with open(os.path.join(out_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    parts = []
+    for i in sorted(int(key) for key in manifest["done"]):
+        with np.load(os.path.join(out_dir, manifest["done"][str(i)]["file"])) as stored:
+            parts.append({key: stored[key] for key in stored.files})
+    if not parts:
+        return {}
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+# KERNELS
+
+# One dict per row; no columns at all means a single row of defaults
+def _rows(columns):
+    n = len(next(iter(columns.values()))) if columns else 1
+    for i in range(n):
+        yield {key: value[i].item() for key, value in columns.items()}
+
+
+def _stack(records):
+    return {key: np.array([record[key] for record in records]) for key in records[0]}
+
+
+# BasicSizing for every row, inputs are any BasicSizing keyword (thrust, Pc, OF, L_star, ...)
+def sizing_kernel(mode="Hotfire", **inputs):
+    return _stack([dataclasses.asdict(BasicSizing(mode, **row)) for row in _rows(inputs)])
+
+
+# Feed line pressure drop for every row, inputs are the calculate_pressure_drop arguments
+def feed_kernel(**inputs):
+    return {"dP": np.array([calculate_pressure_drop(**row) for row in _rows(inputs)])}
+
+
+# BasicSizing followed by TankSizing. Inputs are BasicSizing keywords plus tank keywords prefixed with "tank_"
+def tank_kernel(mode="Hotfire", **inputs):
+    from TankSizing import TankSizing
+
+    records = []
+    for row in _rows(inputs):
+        tank_inputs = {key[5:]: value for key, value in row.items() if key.startswith("tank_")}
+        sizing_inputs = {key: value for key, value in row.items() if not key.startswith("tank_")}
+        records.append(dataclasses.asdict(TankSizing(mode, BasicSizing(mode, **sizing_inputs), **tank_inputs)))
+    return _stack(records)
+
+
+# BasicSizing followed by the injector hole count search, keeping the best ranked candidate per row.
+# Inputs are BasicSizing keywords plus dP_fraction, discharge_coef, shaft_ratio, ox_temp, film_fraction. Without
+# dP_fraction the injector drop follows InjectorSizing's mode rule (20% of Pc hotfire, 80% and >= 40 psi waterflow).
+def injector_kernel(mode="Hotfire", drills_path="Drill_Bits.xlsx", windows=None, weights=None, **inputs):
+    from InjectorSizing import injector_sweep, injector_drop, ox_density, load_drills, film_percent
+    from InjectorRanking import CandidateIndex
+
+    injector_keys = ("dP_fraction", "discharge_coef", "shaft_ratio", "ox_temp", "film_fraction")
+    windows = windows or {"TMR": (0.9, 1.5), "LMR": (1.0, 3.0)}
+    drills = load_drills(drills_path)
+    fuel_rho = 789 if mode == "Hotfire" else 1000
+
+    records = []
+    for row in _rows(inputs):
+        sizing = BasicSizing(mode, **{key: value for key, value in row.items() if key not in injector_keys})
+        delta_P_ox = float(injector_drop(mode, sizing.Pc, row.get("dP_fraction")))
+        ox_rho = ox_density(mode, row.get("ox_temp", 253 if mode == "Hotfire" else 293), sizing.Pc + delta_P_ox)
+        candidates = injector_sweep(sizing.m_dot_ox, sizing.m_dot_fuel * (1 - row.get("film_fraction", film_percent)),
+                                    sizing.OF, ox_rho, fuel_rho, delta_P_ox, sizing.d_c * row.get("shaft_ratio", 1/5),
+                                    drills, row.get("discharge_coef", 0.65))
+
+        index = CandidateIndex(candidates)
+        best = index.rank(1, windows, weights=weights)
+        record = {key: (value[best[0]] if len(best) else np.nan) for key, value in candidates.items()}
+        record["n_valid"] = len(index.query(windows))
+        records.append(record)
+    return _stack(records)
+
+
+# BasicSizing for every row followed by one vectorized chug screen over all rows. Inputs are BasicSizing keywords
+# plus the ChugStability.chug_screen arguments (dP_fraction, line_length, tau, ...)
+def chug_kernel(mode="Hotfire", **inputs):
+    from ChugStability import chug_screen
+
+    chug_keys = ("dP_fraction", "line_length", "line_D_ox", "line_D_fuel", "Cv_ox", "Cv_fuel", "tau", "ox_temp")
+    sizing = sizing_kernel(mode, **{key: value for key, value in inputs.items() if key not in chug_keys})
+    screen = chug_screen(sizing, mode=mode, **{key: value for key, value in inputs.items() if key in chug_keys})
+    return {key: np.asarray(value) for key, value in screen.items()}
+
+
+# BasicSizing and TankSizing for every row, then one batched trajectory over all rows. Inputs are BasicSizing
+# keywords, tank keywords prefixed with "tank_" and the Trajectory.simulate vehicle keywords (m_other, Cd, ...)
+def trajectory_kernel(mode="Hotfire", **inputs):
+    from TankSizing import TankSizing
+    from Trajectory import simulate_design
+
+    vehicle_keys = ("m_other", "diameter", "Cd", "launch_alt", "rail_length")
+    sizings, tanks = [], []
+    for row in _rows({key: value for key, value in inputs.items() if key not in vehicle_keys}):
+        tank_inputs = {key[5:]: value for key, value in row.items() if key.startswith("tank_")}
+        sizing = BasicSizing(mode, **{key: value for key, value in row.items() if not key.startswith("tank_")})
+        sizings.append(dataclasses.asdict(sizing))
+        tanks.append(dataclasses.asdict(TankSizing(mode, sizing, **tank_inputs)))
+
+    vehicle = {key: value for key, value in inputs.items() if key in vehicle_keys}
+    for key in ("id_tank", "od_tank"):
+        if f"tank_{key}" in inputs:
+            vehicle[key] = inputs[f"tank_{key}"]
+    return simulate_design(_stack(sizings), _stack(tanks), **vehicle)
+
+
+if __name__ == "__main__":
+    psi_to_pa = 6894.76
+    lbf_to_N = 4.44822162
+
+    grid = parameter_grid(OF=np.linspace(2, 5, 13), Pc=np.linspace(200, 400, 11) * psi_to_pa,
+                          thrust=np.linspace(300, 600, 7) * lbf_to_N, tank_burn_time=np.array([3.0, 4.0, 5.0]))
+    run_sweep(tank_kernel, grid, "sweep_tank_study", chunk_size=200)
+    results = load_sweep("sweep_tank_study")
+    print(f"{results['safe'].sum()} of {len(results['safe'])} designs have every FOS above 2")
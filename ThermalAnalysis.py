@@ -0,0 +1,220 @@
+# This code provides a 1-D steady state wall thermal model that marches along the NozzleContour stations.
+# It is vectorized over stations and over batches of designs so it can sit inside a design sweep.
+
+# Gas side - Bartz equation (NASA TN D-2216 / Huzel & Huang):
+# h_g = [0.026 / D_t^0.2 * (mu^0.2 * cp / Pr^0.6) * (Pc / c*)^0.8 * (D_t / R_curv)^0.1] * (A_t / A)^0.9 * sigma
+# sigma = 1 / ([0.5 * T_wg/T_c * (1 + (g-1)/2 M^2) + 0.5]^0.68 * [1 + (g-1)/2 M^2]^0.12)
+# Local Mach number comes from the area ratio (subsonic upstream of the throat, supersonic downstream).
+# Recovery (adiabatic wall) temperature: T_aw = T_c * (1 + Pr^(1/3) (g-1)/2 M^2) / (1 + (g-1)/2 M^2)
+
+# Film cooling - energy balance on the film (fraction of the fuel injected along the wall at the injector face):
+# the film picks up h_g (T_aw - T_film) per unit wall area, which gives an effectiveness
+# eta = (T_aw - T_film) / (T_aw - T_film_in) = exp(-integral(h_g * 2 pi r ds) / (m_dot_film * cp_film))
+
+# Wall - series resistance from the film/gas through the wall to the coolant:
+# q = (T_ref - T_cool) / (1/h_g + t_wall/k_wall + 1/h_cool),  T_ref = T_aw - eta * (T_aw - T_film_in)
+# With a regen coolant flow the coolant heats up as it runs counterflow from the nozzle exit to the injector.
+# sigma depends on the wall temperature, so the whole field is iterated a few times.
+
+# Useful links:
+# https://ntrs.nasa.gov/citations/19650012433 (Bartz, NASA TN D-2216)
+# https://events.iist.ac.in/phd/thesis/SC09D002%20FT.pdf Film cooling study
+# https://www.engineeringtoolbox.com/thermal-conductivity-metals-d_858.html
+
+# Imports:
+import numpy as np
+from dataclasses import dataclass
+
+R_universal = 8314.46      # [J/kmol-K]
+
+# Wall materials: thermal conductivity [W/m-K] and max service temperature [K]
+MATERIALS = {
+    "Copper C101": (391.0, 800.0),
+    "CuCrZr": (320.0, 900.0),
+    "6061 Aluminum": (167.0, 590.0),
+    "316 Stainless": (16.3, 1100.0),
+    "Inconel 718": (11.4, 1000.0),
+}
+
+
+@dataclass
+class ThermalResult:
+    x: np.ndarray            # Station axial position [m], (n_designs, n_stations)
+    r: np.ndarray            # Station radius [m]
+    mach: np.ndarray         # Local Mach number
+    h_g: np.ndarray          # Gas side heat transfer coefficient [W/m^2-K]
+    T_aw: np.ndarray         # Adiabatic wall temperature [K]
+    eta_film: np.ndarray     # Film cooling effectiveness
+    q: np.ndarray            # Wall heat flux [W/m^2]
+    T_wg: np.ndarray         # Gas side wall temperature [K]
+    T_wc: np.ndarray         # Coolant side wall temperature [K]
+    T_cool: np.ndarray       # Coolant temperature [K]
+    max_T_wg: np.ndarray     # Peak gas side wall temperature per design [K]
+    heat_load: np.ndarray    # Total heat into the wall per design [W]
+
+
+# Resamples a contour onto n_stations evenly spaced in x so a batch of contours shares one station count
+def resample_contour(x, r, n_stations=120):
+    x_new = np.linspace(x[0], x[-1], n_stations)
+    return x_new, np.interp(x_new, x, r)
+
+
+# Mach number from area ratio A/A*, vectorized bisection (area ratio is monotonic on each branch)
+def mach_from_area_ratio(area_ratio, gamma, supersonic):
+    area_ratio = np.maximum(area_ratio, 1.0)
+    gp1 = (gamma + 1) / 2
+    gm1 = (gamma - 1) / 2
+    exponent = (gamma + 1) / (2 * (gamma - 1))
+
+    lo = np.where(supersonic, 1.0, 1e-6)
+    hi = np.where(supersonic, 50.0, 1.0)
+    for _ in range(60):
+        M = 0.5 * (lo + hi)
+        ratio = (1 / M) * ((1 + gm1 * M**2) / gp1)**exponent
+        too_far = ratio > area_ratio      # subsonic: M too small, supersonic: M too large
+        lo = np.where(too_far != supersonic, M, lo)
+        hi = np.where(too_far != supersonic, hi, M)
+    return 0.5 * (lo + hi)
+
+
+# Variable Definitions:
+# x, r = contour stations [m], shape (n_stations,) or (n_designs, n_stations), x = 0 at the throat
+# Pc = chamber pressure [Pa]
+# c_star = characteristic velocity [m/s] (use c_star * eta_cstar)
+# T_c = chamber temperature [K], gamma = ratio of specific heats, M_w = molecular weight [kg/kmol] (from CEA)
+# m_dot_fuel = total fuel mass flow [kg/s]
+# film_fraction = fraction of the fuel used as wall film (InjectorSizing.film_percent)
+# wall_thickness = hot wall thickness [m], k_wall = wall conductivity [W/m-K]
+# cp_film = film specific heat [J/kg-K], T_film_in = film injection temperature [K]
+# h_cool = coolant side heat transfer coefficient [W/m^2-K]
+# T_cool_in = coolant inlet temperature [K]
+# m_dot_cool, cp_cool = regen coolant flow [kg/s] and specific heat; None keeps the coolant at T_cool_in
+#
+# Every scalar input may also be an array of shape (n_designs,)
+
+def wall_thermal(x, r, Pc, c_star, T_c, gamma, M_w, m_dot_fuel, film_fraction, wall_thickness, k_wall,
+                 cp_film=2440.0, T_film_in=295.0, h_cool=20000.0, T_cool_in=295.0, m_dot_cool=None, cp_cool=2440.0,
+                 throat_curvature_ratio=(1.5 + 0.382) / 2, iterations=3):
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    r = np.atleast_2d(np.asarray(r, dtype=float))
+    n_designs = max(x.shape[0], r.shape[0], *(np.size(v) for v in (Pc, c_star, T_c, gamma, M_w, m_dot_fuel,
+                    film_fraction, wall_thickness, k_wall, h_cool, T_cool_in)))
+    x = np.broadcast_to(x, (n_designs, x.shape[1]))
+    r = np.broadcast_to(r, (n_designs, r.shape[1]))
+
+    # Per design inputs as (n_designs, 1) columns so they broadcast over stations
+    def col(value):
+        return np.broadcast_to(np.asarray(value, dtype=float).reshape(-1, 1), (n_designs, 1))
+
+    Pc, c_star, T_c, gamma, M_w = col(Pc), col(c_star), col(T_c), col(gamma), col(M_w)
+    wall_thickness, k_wall, h_cool, T_cool_in = col(wall_thickness), col(k_wall), col(h_cool), col(T_cool_in)
+    m_dot_film = col(m_dot_fuel) * col(film_fraction)
+
+    # GAS PROPERTIES
+    cp = gamma * R_universal / M_w / (gamma - 1)                        # [J/kg-K]
+    Pr = 4 * gamma / (9 * gamma - 5)                                    # Eucken approximation
+    mu = 46.6e-10 * M_w**0.5 * (T_c * 1.8)**0.6 * 17.8580               # Bartz viscosity fit, lb/in-s -> Pa-s
+
+    # GEOMETRY
+    throat = np.argmin(r, axis=1)[:, None]
+    r_t = np.take_along_axis(r, throat, axis=1)
+    D_t = 2 * r_t
+    R_curv = throat_curvature_ratio * r_t
+    area_ratio = (r / r_t)**2
+    supersonic = np.arange(r.shape[1])[None, :] > throat
+
+    ds = np.hypot(np.diff(x, axis=1), np.diff(r, axis=1))               # Wall segment lengths [m]
+    ds = np.concatenate([np.zeros((n_designs, 1)), ds], axis=1)
+    wall_area = 2 * np.pi * r * ds                                      # Wall area belonging to each station [m^2]
+
+    mach = mach_from_area_ratio(area_ratio, gamma, supersonic)
+    stag = 1 + (gamma - 1) / 2 * mach**2
+    T_aw = T_c * (1 + Pr**(1/3) * (gamma - 1) / 2 * mach**2) / stag
+
+    bartz_const = (0.026 / D_t**0.2 * (mu**0.2 * cp / Pr**0.6) * (Pc / c_star)**0.8 * (D_t / R_curv)**0.1
+                   * (1 / area_ratio)**0.9)
+
+    # FIXED POINT ON WALL TEMPERATURE
+    T_wg = np.broadcast_to(0.5 * (T_aw + T_cool_in), x.shape)
+    T_cool = np.broadcast_to(T_cool_in, x.shape)
+    for _ in range(iterations):
+        sigma = 1 / ((0.5 * T_wg / T_c * stag + 0.5)**0.68 * stag**0.12)
+        h_g = bartz_const * sigma
+
+        # Film effectiveness, marched from the injector face
+        with np.errstate(divide="ignore", invalid="ignore"):
+            film_ntu = np.cumsum(h_g * wall_area, axis=1) / (m_dot_film * cp_film)
+        eta_film = np.where(m_dot_film > 0, np.exp(-film_ntu), 0.0)
+        T_ref = T_aw - eta_film * (T_aw - T_film_in)
+
+        R_total = 1 / h_g + wall_thickness / k_wall + 1 / h_cool
+
+        if m_dot_cool is None:
+            T_cool = np.broadcast_to(T_cool_in, x.shape)
+            q = (T_ref - T_cool) / R_total
+        else:
+            # Counterflow coolant march from the nozzle exit to the injector face
+            m_cp = col(m_dot_cool) * cp_cool
+            q = np.empty(x.shape)
+            T_cool = np.empty(x.shape)
+            T_now = T_cool_in[:, 0].copy()
+            for i in range(x.shape[1] - 1, -1, -1):
+                T_cool[:, i] = T_now
+                q[:, i] = (T_ref[:, i] - T_now) / R_total[:, i]
+                T_now = T_now + q[:, i] * wall_area[:, i] / m_cp[:, 0]
+
+        T_wg = T_ref - q / h_g
+
+    T_wc = T_cool + q / h_cool
+
+    return ThermalResult(x=x, r=r, mach=mach, h_g=h_g, T_aw=T_aw, eta_film=eta_film, q=q, T_wg=T_wg, T_wc=T_wc,
+                         T_cool=T_cool, max_T_wg=T_wg.max(axis=1), heat_load=(q * wall_area).sum(axis=1))
+
+
+# Margin between the material service temperature and the peak wall temperature [K], negative means too hot
+def wall_temperature_margin(result, T_max):
+    return np.asarray(T_max, dtype=float) - result.max_T_wg
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+    from BasicSizing import BasicSizing
+    from NozzleContour import nozzle_contour
+    from InjectorSizing import film_percent
+
+    # RUN BASIC SIZING
+    mode = "Hotfire"
+    sizing = BasicSizing(mode)
+    eta_cstar = 0.85
+    c_star = 1154.1 * eta_cstar      # Same CEA value as BasicSizing
+
+    # Chamber gas properties for N2O/E98 at OF 3 (check against CEA with OFSelection)
+    T_c = 2900          # Chamber temperature [K]
+    gamma = 1.22
+    M_w = 25.0          # Molecular weight [kg/kmol]
+
+    # Wall inputs
+    material = "Copper C101"
+    k_wall, T_max = MATERIALS[material]
+    wall_thickness = 0.002          # 2 mm hot wall
+
+    x, r = nozzle_contour(sizing.d_c/2, sizing.d_t/2, sizing.d_e/2, sizing.L_c, sizing.L_n, sizing.theta_n, sizing.theta_e)
+    x, r = resample_contour(x, r)
+
+    # Batch of film fractions on the same contour
+    film_fractions = np.array([0.0, film_percent, 0.10, 0.15])
+    result = wall_thermal(x, r, sizing.Pc, c_star, T_c, gamma, M_w, sizing.m_dot_fuel, film_fractions,
+                          wall_thickness, k_wall, m_dot_cool=sizing.m_dot_fuel)
+
+    for f, T_peak, margin in zip(film_fractions, result.max_T_wg, wall_temperature_margin(result, T_max)):
+        print(f"Film {f*100:4.1f}%: peak wall temp {T_peak:7.1f} K, margin to {material} limit {margin:7.1f} K")
+
+    plt.figure(figsize=(10, 4))
+    for i, f in enumerate(film_fractions):
+        plt.plot(result.x[i], result.T_wg[i], label=f"film {f*100:.0f}%")
+    plt.axhline(y=T_max, color="red", linestyle="--")
+    plt.xlabel("Length (m)")
+    plt.ylabel("Gas side wall temperature (K)")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
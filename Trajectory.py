@@ -0,0 +1,205 @@
+# This code provides a batched vertical (1-DOF) trajectory simulator so the apogee of a design can be checked inside
+# a sweep instead of in an external tool. Every design is one entry of the state arrays (altitude, velocity, mass),
+# all designs are stepped together with a fixed step RK4, and burnout, rail exit and apogee are caught per design.
+
+# Equations of motion (altitude h above the pad, up positive):
+#   dh/dt = v
+#   dv/dt = (F(h) - D - m g) / m,      D = 1/2 rho(h) v |v| Cd A_ref
+#   dm/dt = -m_dot                      while burning, m_dot from the sizing (thrust / (isp g) if not given)
+# F(h) = thrust + (p_design - p_a(h)) A_e corrects the sizing thrust (quoted at p_design) for the ambient pressure.
+# Atmosphere is ISA: troposphere to 11 km, isothermal to 20 km, then the same exponential decay.
+
+# Events:
+# Each design gets its own boost step, burn_time / ceil(burn_time / dt), so burnout lands exactly on a step and the
+# thrust cutoff never falls inside an RK4 step. After burnout the coast uses dt. Apogee is the step where v changes
+# sign; its time and altitude come from the quadratic through that step. Rail exit is interpolated the same way.
+# A design that cannot lift off (T/W < 1) sits on the pad until burnout and reports an apogee of 0. A design is
+# frozen once its apogee is found and the loop stops when every design is done (or at t_max).
+
+# Useful links:
+# https://en.wikipedia.org/wiki/International_Standard_Atmosphere
+# https://www.grc.nasa.gov/www/k-12/rocket/rktflight.html
+
+# Imports:
+import numpy as np
+
+# Conversion Factors and Constants
+in_to_m = 0.0254
+g0 = 9.80665                  # Standard gravity [m/s^2]
+p_sl = 101325                 # Sea level pressure [Pa]
+rho_6061 = 2700               # 6061 Aluminum density [kg/m^3]
+
+
+# ISA pressure [Pa], density [kg/m^3] and speed of sound [m/s] at geometric altitude z [m]
+def atmosphere(z):
+    z = np.maximum(z, 0.0)
+    T = np.where(z < 11000, 288.15 - 0.0065 * z, 216.65)
+    p = np.where(z < 11000, p_sl * (T / 288.15)**5.25588, 22632.1 * np.exp(-(z - 11000) / 6341.6))
+    rho = p / (287.053 * T)
+    return p, rho, np.sqrt(1.4 * 287.053 * T)
+
+
+# Variable Definitions:
+# thrust = engine thrust at p_design [N]
+# isp = specific impulse [s], only used for the mass flow when m_dot is not given
+# m_prop = loaded propellant mass [kg]
+# m_dry = vehicle mass without propellant [kg]
+# diameter = vehicle reference diameter [m]
+# Cd = drag coefficient (on the reference area)
+# A_e = nozzle exit area [m^2] for the ambient pressure thrust correction (0 turns it off)
+# p_design = ambient pressure the thrust is quoted at [Pa]
+# launch_alt = launch site altitude above sea level [m]
+# rail_length = launch rail length [m]
+# dt = coast time step [s] (boost steps are at most dt). RK4 apogees at 0.1 s agree with 0.005 s to ~1e-9
+# t_max = longest flight time simulated [s]
+# m_dot = propellant mass flow [kg/s]; None (or nan) derives it from thrust / (isp g0). Pass the sizing's
+#         m_dot_total so the burn matches BasicSizing (which uses g = 9.81 for isp)
+#
+# Every argument except dt and t_max can be an array, they broadcast to one entry per design.
+# Returns one column per result for every design.
+
+def simulate(thrust, isp, m_prop, m_dry, diameter=6 * in_to_m, Cd=0.5, A_e=0.0, p_design=p_sl, launch_alt=0.0,
+             rail_length=5.0, dt=0.1, t_max=300.0, m_dot=None):
+    m_dot = np.nan if m_dot is None else m_dot
+    thrust, isp, m_prop, m_dry, diameter, Cd, A_e, p_design, launch_alt, rail_length, m_dot = (
+        np.array(value, dtype=float).ravel() for value in
+        np.broadcast_arrays(thrust, isp, m_prop, m_dry, diameter, Cd, A_e, p_design, launch_alt, rail_length, m_dot))
+    n = len(thrust)
+
+    m_dot = np.where(np.isnan(m_dot), thrust / (isp * g0), m_dot)
+    burn_time = m_prop / m_dot
+    dt_boost = burn_time / np.ceil(burn_time / dt)
+    drag_area = 0.5 * Cd * np.pi * (diameter / 2)**2
+
+    def derivatives(h, v, m, burning):
+        p_a, rho, _ = atmosphere(launch_alt + h)
+        F = np.where(burning, thrust + (p_design - p_a) * A_e, 0.0)
+        a = (F - drag_area * rho * v * np.abs(v)) / m - g0
+        a = np.where((h <= 0) & (v <= 0) & (a < 0), 0.0, a)          # Resting on the pad
+        return v, a, np.where(burning, -m_dot, 0.0)
+
+    # State
+    t = np.zeros(n)
+    h = np.zeros(n)
+    v = np.zeros(n)
+    m = m_dry + m_prop
+    burning = np.ones(n, dtype=bool)
+    active = np.ones(n, dtype=bool)
+
+    results = {
+        "burn_time": burn_time,
+        "thrust_to_weight": thrust / ((m_dry + m_prop) * g0),
+        "burnout_alt": np.zeros(n),
+        "burnout_vel": np.zeros(n),
+        "rail_exit_vel": np.full(n, np.nan),
+        "max_vel": np.zeros(n),
+        "max_mach": np.zeros(n),
+        "max_accel": np.zeros(n),
+        "max_q": np.zeros(n),
+        "apogee": np.zeros(n),
+        "t_apogee": np.full(n, np.nan),
+    }
+
+    while active.any():
+        step = np.where(burning, dt_boost, dt) * active
+
+        # RK4, the burning flag is constant over a step
+        k1 = derivatives(h, v, m, burning)
+        k2 = derivatives(h + step / 2 * k1[0], v + step / 2 * k1[1], m + step / 2 * k1[2], burning)
+        k3 = derivatives(h + step / 2 * k2[0], v + step / 2 * k2[1], m + step / 2 * k2[2], burning)
+        k4 = derivatives(h + step * k3[0], v + step * k3[1], m + step * k3[2], burning)
+        h_new = np.maximum(h + step / 6 * (k1[0] + 2 * k2[0] + 2 * k3[0] + k4[0]), 0.0)
+        v_new = v + step / 6 * (k1[1] + 2 * k2[1] + 2 * k3[1] + k4[1])
+        m_new = m + step / 6 * (k1[2] + 2 * k2[2] + 2 * k3[2] + k4[2])
+        v_new = np.where(h_new <= 0, np.maximum(v_new, 0.0), v_new)
+        t_new = t + step
+
+        # Rail exit
+        exit_rail = active & np.isnan(results["rail_exit_vel"]) & (h < rail_length) & (h_new >= rail_length)
+        frac = (rail_length - h) / np.where(h_new > h, h_new - h, 1.0)
+        results["rail_exit_vel"] = np.where(exit_rail, v + frac * (v_new - v), results["rail_exit_vel"])
+
+        # Apogee, quadratic through the step (v linear in time)
+        apogee = active & ~burning & (v > 0) & (v_new <= 0)
+        accel = (v_new - v) / np.where(step > 0, step, 1.0)
+        t_star = np.where(apogee, -v / np.where(accel < 0, accel, -1.0), 0.0)
+        results["apogee"] = np.where(apogee, h + v * t_star + 0.5 * accel * t_star**2, results["apogee"])
+        results["t_apogee"] = np.where(apogee, t + t_star, results["t_apogee"])
+
+        # Peaks
+        _, rho, sound = atmosphere(launch_alt + h_new)
+        results["max_vel"] = np.maximum(results["max_vel"], v_new)
+        results["max_mach"] = np.maximum(results["max_mach"], np.abs(v_new) / sound)
+        results["max_accel"] = np.maximum(results["max_accel"], np.where(active, k1[1], 0.0))
+        results["max_q"] = np.maximum(results["max_q"], 0.5 * rho * v_new**2)
+
+        # Burnout
+        burnout = burning & (t_new >= burn_time - 1e-9 * burn_time)
+        results["burnout_alt"] = np.where(burnout, h_new, results["burnout_alt"])
+        results["burnout_vel"] = np.where(burnout, v_new, results["burnout_vel"])
+
+        # Never left the pad
+        grounded = burnout & (h_new <= 0) & (v_new <= 0)
+        results["t_apogee"] = np.where(grounded, t_new, results["t_apogee"])
+
+        t, h, v, m = t_new, h_new, v_new, np.where(burnout, m_dry, m_new)
+        burning = burning & ~burnout
+        active = active & ~apogee & ~grounded & (t < t_max)
+
+    return results
+
+
+# Dry mass of the vehicle: everything else plus the two aluminum tank casings from TankSizing
+def vehicle_dry_mass(len_ox, len_fuel, m_other, id_tank=3.75 * in_to_m, od_tank=4 * in_to_m):
+    casing_area = np.pi / 4 * (od_tank**2 - id_tank**2)
+    return m_other + casing_area * (np.asarray(len_ox) + np.asarray(len_fuel)) * rho_6061
+
+
+# Trajectory straight from sizing and tank results. sizing/tank are RocketSizing/TankResults or the dicts of
+# columns from SweepExecutor.sizing_kernel/tank_kernel; m_other = vehicle mass without propellant or tanks [kg]
+def simulate_design(sizing, tank, m_other=15.0, id_tank=3.75 * in_to_m, od_tank=4 * in_to_m, **vehicle):
+    import dataclasses
+
+    sizing = sizing if isinstance(sizing, dict) else dataclasses.asdict(sizing)
+    tank = tank if isinstance(tank, dict) else dataclasses.asdict(tank)
+    m_dry = vehicle_dry_mass(tank["len_ox"], tank["len_fuel"], m_other, id_tank, od_tank)
+    A_e = np.pi * (np.asarray(sizing["d_e"]) / 2)**2
+    return simulate(sizing["thrust"], sizing["isp"], tank["mass_total_req"], m_dry, A_e=A_e,
+                    m_dot=sizing["m_dot_total"], **vehicle)
+
+
+if __name__ == "__main__":
+    import time
+    import matplotlib.pyplot as plt
+    from BasicSizing import BasicSizing
+    from TankSizing import TankSizing
+
+    # Current design
+    sizing = BasicSizing("Hotfire")
+    tank = TankSizing("Hotfire", sizing, burn_time=4)
+    current = simulate_design(sizing, tank)
+    print(f"Current design: T/W {current['thrust_to_weight'][0]:.2f}, rail exit {current['rail_exit_vel'][0]:.1f} m/s, "
+          f"burnout {current['burnout_alt'][0]:.0f} m at {current['burnout_vel'][0]:.0f} m/s, "
+          f"apogee {current['apogee'][0]:.0f} m at {current['t_apogee'][0]:.1f} s")
+
+    # Thrust x burn time study, every row through BasicSizing and TankSizing first
+    from SweepExecutor import parameter_grid, trajectory_kernel
+    lbf_to_N = 4.44822162
+    grid = parameter_grid(thrust=np.linspace(300, 800, 26) * lbf_to_N, tank_burn_time=np.linspace(2, 10, 33))
+
+    start = time.perf_counter()
+    study = trajectory_kernel(**grid)
+    print(f"{len(grid['thrust'])} designs sized and flown in {time.perf_counter() - start:.2f} s")
+
+    shape = (26, 33)
+    thrust = grid["thrust"].reshape(shape)
+    burn_time = grid["tank_burn_time"].reshape(shape)
+    apogee = study["apogee"].reshape(shape)
+    plt.figure(figsize=(7, 5))
+    contour = plt.contourf(burn_time, thrust / lbf_to_N, apogee / 0.3048, levels=20)
+    plt.colorbar(contour, label="Apogee [ft]")
+    plt.xlabel("Burn time [s]")
+    plt.ylabel("Thrust [lbf]")
+    plt.title("Apogee, 15 kg of non-tank dry mass")
+    plt.tight_layout()
+    plt.show()